@@ -1,8 +1,13 @@
 import streamlit as st
-import numpy as np
-import time
 import random
-from PIL import Image
+import sungka_engine as engine
+from sungka_bot import BOT_ENGINES, bot_for_difficulty
+from sungka_mcts import get_executor
+from sungka_tt import TranspositionTable
+from sungka_book import load_book
+from sungka_assets import AVATARS, AssetStore
+from sungka_svg import render_sowing_svg
+from sungka_leaderboard import Leaderboard
 
 # Initialize session state
 if 'page' not in st.session_state:
@@ -10,15 +15,31 @@ if 'page' not in st.session_state:
     st.session_state.players = []
     st.session_state.avatars = {}
     st.session_state.difficulty = None
-    st.session_state.board, st.session_state.ulo_p1, st.session_state.ulo_p2 = [7] * 10, 0, 0
+    st.session_state.board, st.session_state.ulo_p1, st.session_state.ulo_p2 = [engine.INITIAL_HOUSES[i] for i in engine.P1_HOUSES + engine.P2_HOUSES], 0, 0
     st.session_state.round = 1
 
 def navigate_to(page):
     st.session_state.page = page
 
+# Downscaled avatar GIFs, transcoded once per process and served from memory
+@st.cache_resource
+def asset_store():
+    store = AssetStore()
+    store.preload_async(AVATARS, [100, 200])
+    store.preload_async(["Hand.gif"], [100])
+    return store
+
+def show_asset(path, width):
+    st.image(asset_store().get(path, width), width=width)
+
+# MCTS worker processes, started with the app so the bot's first move doesn't wait for them
+@st.cache_resource
+def mcts_pool():
+    return get_executor()
+
+mcts_pool()
+
 
-# Load background image
-bg_image = Image.open('BG.jpg')
 # Set background color and adjust the general look using Python
 st.markdown("""
     <style>
@@ -39,6 +60,14 @@ st.markdown("""
             border-radius: 10px;
             font-family: 'Courier', monospace;
         }
+        /* Banners fade in on the client instead of pausing the script */
+        .round-banner {
+            animation: banner-fade 2s ease-out;
+        }
+        @keyframes banner-fade {
+            from { opacity: 0; transform: scale(1.5); }
+            to { opacity: 1; transform: scale(1); }
+        }
         /* Sidebar background color */
         .sidebar .sidebar-content {
             background-color: #DD88CF;
@@ -65,8 +94,12 @@ if st.session_state.page != 'home':
 
 # Function to reset the board for a new game
 def reset_board():
-    st.session_state.board = [7] * 5 + [0] + [7] * 5 + [0]
+    st.session_state.board = list(engine.INITIAL_HOUSES[1:])
+    st.session_state.houses_p1 = [engine.INITIAL_HOUSES[i] for i in engine.P1_HOUSES]
+    st.session_state.houses_p2 = [engine.INITIAL_HOUSES[i] for i in engine.P2_HOUSES]
+    st.session_state.ulo_p1 = st.session_state.ulo_p2 = 0
     st.session_state.round = 1
+    st.session_state.game_saved = False
     st.session_state.scores = {"Player 1": 0, "Player 2": 0}
 
 def player_setup_page():
@@ -95,7 +128,7 @@ def player_setup_page():
     if "avatars" not in st.session_state:
         st.session_state.avatars = {}
 
-    avatar_choices = [f"AV{i+1}.gif" for i in range(9)]  # 9 avatars available
+    avatar_choices = AVATARS  # 9 avatars available
 
     # Avatar Selection
     for player in st.session_state.players:
@@ -113,7 +146,7 @@ def player_setup_page():
                     key=f"{player}_avatar_{i}"
                 ):
                     st.session_state.avatars[player] = avatar
-                st.image(avatar, width=100)
+                show_asset(avatar, 100)
 
     if st.button("Next"):
         st.session_state.page = 'difficulty_selection'
@@ -122,12 +155,16 @@ def player_setup_page():
 def difficulty_selection_page():
     st.title("Select Difficulty")
     difficulty = st.radio("Choose Difficulty", ["Easy", "Medium", "Hard"])
+    bot_engine = st.radio("Bot Engine", BOT_ENGINES)
     if st.button("Start Math Challenge"):
         st.session_state.difficulty = difficulty
+        st.session_state.bot_engine = bot_engine
         st.session_state.page = 'math_challenge'
 
 # Math Challenge Page
 def math_challenge_page():
+    import numpy as np  # Only the math challenge needs NumPy
+
     st.title("Math Challenge")
     st.write("Solve the function to determine who goes first!")
 
@@ -204,6 +241,7 @@ def math_challenge_page():
             st.session_state.first_turn = first_turn
             st.write(f"🎲 **{first_turn} goes first!**")
 
+        reset_board()  # Start the game on a fresh board
         st.session_state.page = 'game'  # Proceed to the game phase
 
 # Game Mechanics
@@ -232,61 +270,68 @@ if 'ulo_p1' not in st.session_state:
 if 'ulo_p2' not in st.session_state:
     st.session_state.ulo_p2 = 0
 if 'houses_p1' not in st.session_state:
-    st.session_state.houses_p1 = [7, 7, 7, 7, 7]  # Player 1's houses
+    st.session_state.houses_p1 = [engine.INITIAL_HOUSES[i] for i in engine.P1_HOUSES]  # Player 1's houses
 if 'houses_p2' not in st.session_state:
-    st.session_state.houses_p2 = [7, 7, 7, 7, 7]  # Player 2's houses
+    st.session_state.houses_p2 = [engine.INITIAL_HOUSES[i] for i in engine.P2_HOUSES]  # Player 2's houses
 if 'game_mode' not in st.session_state:  # Add game mode (1 player or 2 player)
     st.session_state.game_mode = "2 Player"  # Default is 2 Player
 
-# Function to distribute marbles with animation
-def distribute_marbles(player, house_choice):
-    if player == 'Player 1':
-        houses = st.session_state.houses_p1
-        opponent_houses = st.session_state.houses_p2
-        player_head = st.session_state.ulo_p1
-        opponent_head = st.session_state.ulo_p2
-    else:
-        houses = st.session_state.houses_p2
-        opponent_houses = st.session_state.houses_p1
-        player_head = st.session_state.ulo_p2
-        opponent_head = st.session_state.ulo_p1
-    
-    marbles_to_move = houses[house_choice - 1]
-    houses[house_choice - 1] = 0
-    current_index = house_choice - 1
-
-    while marbles_to_move > 0:
-        current_index = (current_index + 1) % 10
-        if player == 'Player 1' and current_index == 9:
-            continue
-        elif player == 'Player 2' and current_index == 4:
-            continue
-        
-        # Highlight the house while distributing
-        if current_index < 5:
-            houses[current_index] += 1
-            st.session_state.houses_p1 = houses  # Update Player 1's houses
-        elif current_index == 5:
-            player_head += 1
-        else:
-            opponent_houses[current_index - 6] += 1
+MAX_ROUNDS = 5  # The game ends after 5 rounds
 
-        # Animate the shell move with a short pause
-        time.sleep(0.5)  # Adjust the sleep time for animation speed
-        
-        # Highlight the house (temporarily turn red and then back to black)
-        st.write(f"<div style='color: red;'>House {current_index + 1}</div>", unsafe_allow_html=True)
+# Convert this page's houses_p1/houses_p2/ulo layout to an engine position
+def current_state(player):
+    houses = ([0] + st.session_state.houses_p1 + [st.session_state.ulo_p1]
+              + st.session_state.houses_p2 + [st.session_state.ulo_p2])
+    return engine.State(houses, 1 if player == 'Player 1' else 2, st.session_state.round)
 
-        marbles_to_move -= 1
-    
-    if player == 'Player 1':
-        st.session_state.ulo_p1 = player_head
-    else:
-        st.session_state.ulo_p2 = player_head
+# Write an engine position back into houses_p1/houses_p2/ulo
+def store_state(state):
+    houses = state.to_list()
+    st.session_state.houses_p1 = [houses[i] for i in engine.P1_HOUSES]
+    st.session_state.ulo_p1 = houses[engine.P1_ULO]
+    st.session_state.houses_p2 = [houses[i] for i in engine.P2_HOUSES]
+    st.session_state.ulo_p2 = houses[engine.P2_ULO]
+
+# Function to distribute marbles with animation
+def distribute_marbles(player, house_choice):
+    state = current_state(player)
+    pit = engine.HOUSES[state.player][house_choice - 1]
+    if pit not in engine.legal_moves(state):
+        return  # Ignore empty houses
+
+    # Animate the shell move in the browser: the whole sowing trace is sent at once
+    frames = [tuple(state.houses)] + engine.sowing_trace(state, pit)
+    st.markdown(render_sowing_svg(frames), unsafe_allow_html=True)
+
+    store_state(engine.apply_move(state, pit))
+
+# One transposition table per process, shared by the bots of every session
+@st.cache_resource
+def shared_transposition_table():
+    return TranspositionTable(size_mb=16)
+
+# Opening book built offline with sungka_book.py (None when not built)
+@st.cache_resource
+def opening_book():
+    return load_book()
+
+# Pick the bot's house (1-5) with the search bot for the chosen difficulty
+def choose_bot_house():
+    state = current_state('Player 2')
+    # The search stops at this page's round limit, like the game itself
+    bot = bot_for_difficulty(st.session_state.difficulty, MAX_ROUNDS, st.session_state.get('bot_engine', "Alpha-Beta"),
+                             tt=shared_transposition_table(), book=opening_book())
+    pit = bot.choose_move(state)
+    return engine.P2_HOUSES.index(pit) + 1
+
+# Persistent leaderboard (SQLite), shared by every session
+@st.cache_resource
+def leaderboard():
+    return Leaderboard()
 
 # Function for bot's automatic move (Player 2)
 def bot_move():
-    house_choice = random.randint(1, 5)  # Bot chooses a random house
+    house_choice = choose_bot_house()  # Bot searches for the best house
     st.write(f"Bot selects House {house_choice} and moves the marbles...")
     distribute_marbles('Player 2', house_choice)  # Bot's marbles move logic
     st.write(f"Updated P2 Houses: {st.session_state.houses_p2}")
@@ -297,14 +342,13 @@ def game_page():
     st.title("Sungka Game")
 
     # Display Round Announcement
-    st.markdown(f"<h1 style='text-align: center; color: red;'>Round {st.session_state.round}</h1>", unsafe_allow_html=True)
-    time.sleep(2)
+    st.markdown(f"<h1 class='round-banner' style='text-align: center; color: red;'>Round {st.session_state.round}</h1>", unsafe_allow_html=True)
 
     # Show avatars and names in two columns
     cols = st.columns(2)
     for i, player in enumerate(st.session_state.players):
         with cols[i]:
-            st.image(st.session_state.avatars.get(player, ""), width=200)
+            show_asset(st.session_state.avatars.get(player, "AV1.gif"), 200)
             st.write(player)
 
     # Display game board with dynamic input for houses
@@ -325,10 +369,10 @@ def game_page():
     st.text_input("P2 Head", value=st.session_state.ulo_p2, key="p2_head", help="Accumulated Marbles", disabled=True)
 
     # Avatar image for hand animation
-    st.image("Hand.gif", width=100)
+    show_asset("Hand.gif", 100)
 
     # Player's turn handling
-    if st.session_state.round <= 5:
+    if st.session_state.round <= MAX_ROUNDS:
         # Player 1's turn
         if st.session_state.round % 2 != 0:
             house_choice = st.selectbox("Choose a house to pick from (Player 1)", [1, 2, 3, 4, 5])
@@ -370,8 +414,13 @@ def game_page():
                     st.session_state.round += 1
 
     # End game after 5 rounds
-    if st.session_state.round > 5:
+    if st.session_state.round > MAX_ROUNDS:
         st.session_state.page = 'game_over'
+        # Recorded once per game: the page can be reopened on a finished board
+        if not st.session_state.get('game_saved'):
+            leaderboard().record(st.session_state.players[0], st.session_state.players[1],
+                                 st.session_state.ulo_p1, st.session_state.ulo_p2)
+            st.session_state.game_saved = True
         st.write("Game Over! Final Scores:")
         st.write(f"Player 1: {st.session_state.ulo_p1} marbles")
         st.write(f"Player 2: {st.session_state.ulo_p2} marbles")
@@ -384,10 +433,13 @@ def game_page():
 
 # Bot move handling (for 1 Player mode)
 def bot_move():
+    # The player's move may have ended the game (e.g. the last round); the bot doesn't move then
+    if engine.is_terminal(current_state('Player 2'), MAX_ROUNDS):
+        return
     st.write("Bot's turn...")
     
-    # Simulate the bot's move: randomly select a house
-    house_choice_bot = random.choice([1, 2, 3, 4, 5])
+    # Search for the bot's move with the budget of the chosen difficulty
+    house_choice_bot = choose_bot_house()
     st.write(f"Bot selects House {house_choice_bot} and moves the marbles...")
 
     # Distribute marbles for the Bot (Player 2)
@@ -403,11 +455,11 @@ def bot_move():
 def game_over_page():
     st.title("Game Over")
     winner = max(st.session_state.players, key=lambda p: st.session_state.ulo_p1 if p == st.session_state.players[0] else st.session_state.ulo_p2)
-    st.markdown(f"<h1 style='text-align: center; color: green;'>Game Over</h1>", unsafe_allow_html=True)
-    time.sleep(2)
+    st.markdown(f"<h1 class='round-banner' style='text-align: center; color: green;'>Game Over</h1>", unsafe_allow_html=True)
     st.markdown(f"<h2 style='text-align: center;'>Winner: {winner}</h2>", unsafe_allow_html=True)
     st.markdown(f"<h3 style='text-align: center;'>Points: {st.session_state.ulo_p1 if winner == st.session_state.players[0] else st.session_state.ulo_p2}</h3>", unsafe_allow_html=True)
     if st.button("Play Again"):
+        reset_board()
         st.session_state.page = 'home'
 
 # Page Navigation
@@ -428,8 +480,9 @@ elif st.session_state.page == 'game_over':
 # Leaderboard
 if st.session_state.page == 'leaderboard':
     st.header("Leaderboard")
-    st.write(f"{st.session_state.names['Player 1']}: {st.session_state.scores['Player 1']} points")
-    st.write(f"{st.session_state.names['Player 2']}: {st.session_state.scores['Player 2']} points")
+    # Top players across every session, ranked by wins and then points
+    for i, row in enumerate(leaderboard().top(10), 1):
+        st.write(f"{i}. {row['name']}: {row['wins']} wins in {row['games']} games, {row['points']} points")
     
     if st.button("Restart Game"):
         reset_board()
@@ -1,10 +1,18 @@
 import streamlit as st
-import matplotlib.pyplot as plt
-import numpy as np
-import matplotlib.patches as patches
-import time
+import os
 import random
-from PIL import Image
+from concurrent.futures import ThreadPoolExecutor
+import sungka_engine as engine
+from sungka_bot import BOT_ENGINES, bot_for_difficulty
+from sungka_mcts import get_executor
+from sungka_tt import TranspositionTable
+from sungka_book import load_book
+from sungka_assets import AVATARS, AssetStore
+from sungka_svg import render_board_svg, render_sowing_svg
+from sungka_records import GameRecorder
+from sungka_leaderboard import Leaderboard
+from sungka_online import GameStore
+from sungka_ponder import Ponderer
 
 
 # Initialize session state
@@ -14,17 +22,33 @@ if 'page' not in st.session_state:
     st.session_state.avatars = {}
     st.session_state.difficulty = None
 if 'houses' not in st.session_state:
-    st.session_state.houses = [0, 7, 7, 7, 7, 7,  # P1 Head (index 0) + P1 Houses (1-5)
-                            0,                 # P2 Head (index 6)
-                            7, 7, 7, 7, 7,     # P2 Houses (7-11)
-                            0]                 # P1 Head (index 12)
+    st.session_state.houses = list(engine.INITIAL_HOUSES)
     st.session_state.current_player = 1
     st.session_state.round = 1
 
 def navigate_to(page):
     st.session_state.page = page
-# Load background image
-bg_image = Image.open('BG.jpg')
+
+# The board page of the chosen mode: online players have no local board (and only one name)
+def game_page_for_mode():
+    return 'online_game' if st.session_state.get('game_mode') == "Online" else 'game'
+
+# Downscaled avatar GIFs, transcoded once per process and served from memory
+@st.cache_resource
+def asset_store():
+    store = AssetStore()
+    store.preload_async(AVATARS, [100, 250])
+    return store
+
+def show_asset(path, width):
+    st.image(asset_store().get(path, width), width=width)
+
+# MCTS worker processes, started with the app so the bot's first move doesn't wait for them
+@st.cache_resource
+def mcts_pool():
+    return get_executor()
+
+mcts_pool()
 # Set background color and adjust the general look using Python
 st.markdown("""
     <style>
@@ -45,6 +69,14 @@ st.markdown("""
             border-radius: 10px;
             font-family: 'Courier', monospace;
         }
+        /* Banners fade in on the client instead of pausing the script */
+        .round-banner {
+            animation: banner-fade 2s ease-out;
+        }
+        @keyframes banner-fade {
+            from { opacity: 0; transform: scale(1.5); }
+            to { opacity: 1; transform: scale(1); }
+        }
         /* Sidebar background color */
         .sidebar .sidebar-content {
             background-color: #DD88CF;
@@ -68,23 +100,27 @@ if st.session_state.page != 'home':
         st.button("Home", on_click=lambda: navigate_to('home'))
         st.button("Game Options", on_click=lambda: navigate_to('player_setup'))
         st.button("Game Mechanics", on_click=lambda: navigate_to('game_mechanics'))
-        st.button("Game", on_click=lambda: navigate_to('game'))
+        st.button("Game", on_click=lambda: navigate_to(game_page_for_mode()))
         st.button("Leaderboard", on_click=lambda: navigate_to('leaderboard'))
 
 # Function to reset the board for a new game
 def reset_board():
-    st.session_state.houses = [0, 7, 7, 7, 7, 7,  # P1 Head (index 0) + P1 Houses (1-5)
-                            0,                 # P2 Head (index 6)
-                            7, 7, 7, 7, 7,     # P2 Houses (7-11)
-                            0]                 # P1 Head (index 12)
+    if 'ponderer' in st.session_state:
+        st.session_state.ponderer.cancel()
+    st.session_state.houses = list(engine.INITIAL_HOUSES)
+    st.session_state.current_player = 1
+    st.session_state.first_player = 1
     st.session_state.round = 1
+    st.session_state.bot_log = []
+    st.session_state.move_history = []
+    st.session_state.game_saved = False
     st.session_state.scores = {"Player 1": 0, "Player 2": 0}
 
 def player_setup_page():
     st.title("Player Setup")
 
-    # Select number of players
-    num_players = st.radio("How many players?", [1, 2])
+    # Select number of players ("Online": two players in different browsers)
+    num_players = st.radio("How many players?", [1, 2, "Online"])
 
     # Assign player names
     player1_name = st.text_input("Player 1 Name:", "")
@@ -93,6 +129,11 @@ def player_setup_page():
         st.session_state.players = [player1_name if player1_name else "Player 1", "Bot"]
         # Set the game mode to "1 Player"
         st.session_state.game_mode = "1 Player"
+    elif num_players == "Online":
+        # The opponent joins from their own session, in the lobby
+        st.session_state.online_name = player1_name if player1_name else "Player 1"
+        st.session_state.players = [st.session_state.online_name]
+        st.session_state.game_mode = "Online"
     else:
         player2_name = st.text_input("Player 2 Name:", "")
         st.session_state.players = [
@@ -106,7 +147,7 @@ def player_setup_page():
     if "avatars" not in st.session_state:
         st.session_state.avatars = {}
 
-    avatar_choices = [f"AV{i+1}.gif" for i in range(9)]  # 9 avatars available
+    avatar_choices = AVATARS  # 9 avatars available
 
     # Avatar Selection
     for player in st.session_state.players:
@@ -124,21 +165,25 @@ def player_setup_page():
                     key=f"{player}_avatar_{i}"
                 ):
                     st.session_state.avatars[player] = avatar
-                st.image(avatar, width=100)
+                show_asset(avatar, 100)
 
     if st.button("Next"):
-        st.session_state.page = 'difficulty_selection'
+        st.session_state.page = 'online_lobby' if num_players == "Online" else 'difficulty_selection'
 
 # Difficulty Selection Page
 def difficulty_selection_page():
     st.title("Select Difficulty")
     difficulty = st.radio("Choose Difficulty", ["Easy", "Medium", "Hard"])
+    bot_engine = st.radio("Bot Engine", BOT_ENGINES)
     if st.button("Start Math Challenge"):
         st.session_state.difficulty = difficulty
+        st.session_state.bot_engine = bot_engine
         st.session_state.page = 'math_challenge'
 
 # Math Challenge Page
 def math_challenge_page():
+    import numpy as np  # Only the math challenge needs NumPy
+
     st.title("Math Challenge")
     st.write("Solve the function to determine who goes first!")
 
@@ -215,6 +260,9 @@ def math_challenge_page():
             st.session_state.first_turn = first_turn
             st.write(f"🎲 **{first_turn} goes first!**")
 
+        # Start a fresh board with the winner of the challenge to move
+        reset_board()
+        st.session_state.current_player = st.session_state.first_player = st.session_state.players.index(first_turn) + 1
         st.session_state.page = 'game'  # Proceed to the game phase
 
 # Game Mechanics
@@ -229,7 +277,7 @@ if st.session_state.page == 'game_mechanics':
     """)
     
     if st.button("Next", key="mechanics_next"):
-        navigate_to('game')
+        navigate_to(game_page_for_mode())
 
 
 
@@ -243,109 +291,146 @@ if st.session_state.page == 'game_mechanics':
     if 'game_mode' not in st.session_state:  # Add game mode (1 player or 2 player)
         st.session_state.game_mode = "2 Player"  # Default is 2 Player
 
-# Function to draw the Sungka board
-def draw_sungka_board():
-    fig, ax = plt.subplots(figsize=(10, 5))
-    
-    board_color = "#8B4513"
-    ulo_color = "#00008B"
-    house_color = "#87CEEB"
-    pebble_color = "black"
-
-    # Define house and ulo indexes for easier handling
-    P1_HOUSES = [5, 4, 3, 2, 1]  # Player 1 Houses (Top row, left to right)
-    P2_HOUSES = [7, 8, 9, 10, 11]  # Player 2 Houses (Bottom row, left to right)
-    P1_ULO = 6  # Player 1's ulo (left head)
-    P2_ULO = 12  # Player 2's ulo (right head)
-
-    ax.add_patch(patches.FancyBboxPatch((-6.5, -2), 13, 4, boxstyle="round,pad=0.2", color=board_color, ec="black", lw=2))
-
-    # Player 1 ULO (left side)
-    ax.add_patch(patches.Ellipse((-5.5, 0), 1.5, 2.5, color=ulo_color, ec="black", lw=2, zorder=1))
-    ax.text(-5.5, 0, str(st.session_state.houses[P1_ULO]), fontsize=14, ha='center', va='center', 
-            color='white', bbox=dict(facecolor='red', edgecolor='black', boxstyle='round,pad=0.3'))
-
-    # Player 2 ULO (right side)
-    ax.add_patch(patches.Ellipse((5.5, 0), 1.5, 2.5, color=ulo_color, ec="black", lw=2, zorder=1))
-    ax.text(5.5, 0, str(st.session_state.houses[P2_ULO]), fontsize=14, ha='center', va='center', 
-            color='white', bbox=dict(facecolor='red', edgecolor='black', boxstyle='round,pad=0.3'))
-
-    # Player 1 Houses (Top Row)
-    positions_top = [-4, -2, 0, 2, 4]
-    for i, x in zip(P1_HOUSES, positions_top):
-        ax.add_patch(patches.Circle((x, 1), 0.8, color=house_color, ec="black", lw=2, zorder=2))
-        ax.text(x, 2.2, str(st.session_state.houses[i]), fontsize=12, ha='center', va='center',
-                color='white', bbox=dict(facecolor='red', edgecolor='black', boxstyle='round,pad=0.3'))
-
-    # Player 2 Houses (Bottom Row)
-    positions_bottom = [-4, -2, 0, 2, 4]
-    for i, x in zip(P2_HOUSES, positions_bottom):
-        ax.add_patch(patches.Circle((x, -1), 0.8, color=house_color, ec="black", lw=2, zorder=2))
-        ax.text(x, -2.2, str(st.session_state.houses[i]), fontsize=12, ha='center', va='center',
-                color='white', bbox=dict(facecolor='red', edgecolor='black', boxstyle='round,pad=0.3'))
-
-    # Function to add pebbles
-    def add_pebbles(x, y, count):
-        for j in range(count):
-            px = x + (j % 3 - 1) * 0.25
-            py = y + (j // 3 - 0.5) * 0.25
-            ax.add_patch(patches.Ellipse((px, py), 0.15, 0.2, color=pebble_color, zorder=3))
-
-    # Add pebbles to each house
-    for i, x in zip(P1_HOUSES, positions_top):
-        add_pebbles(x, 1, st.session_state.houses[i])  # Player 1 houses
-    for i, x in zip(P2_HOUSES, positions_bottom):
-        add_pebbles(x, -1, st.session_state.houses[i])  # Player 2 houses
-
-
-    ax.set_xlim(-8, 8)
-    ax.set_ylim(-5, 5)
-    ax.set_xticks([])
-    ax.set_yticks([])
-    ax.set_frame_on(False)
-    return fig
+# Define House Indexes for Each Player
+P1_HOUSES = list(reversed(engine.P1_HOUSES))  # Player 1's Houses (left to right)
+P2_HOUSES = list(engine.P2_HOUSES)  # Player 2's Houses (right to left)
+
+P1_ULO = engine.P1_ULO  # Player 1's ulo (head)
+P2_ULO = engine.P2_ULO  # Player 2's ulo (head)
+
+MAX_ROUNDS = 5  # The game ends after 5 rounds
+
+# Board backend: "png" (matplotlib, rendered on the server) or "svg" (drawn by the browser)
+BOARD_RENDERER = os.environ.get("SUNGKA_BOARD_RENDERER", "png")
+
+# Rendered boards shared by every session, keyed by the board contents
+@st.cache_resource
+def board_render_cache():
+    from sungka_render import RenderCache  # matplotlib is only needed for the png backend
+    return RenderCache(max_entries=256)
+
+# One figure per session, created on its first cache miss and updated in place
+# afterwards; spectators usually find every board already rendered
+def render_png(houses):
+    if 'board_renderer' not in st.session_state:
+        from sungka_render import BoardRenderer
+        st.session_state.board_renderer = BoardRenderer()
+    return st.session_state.board_renderer.render_png(houses)
+
+def board_png(houses):
+    return board_render_cache().get(tuple(houses), render_png)
+
+def show_board(houses):
+    # Replay the last moves in the browser once, then show the plain board
+    frames = st.session_state.pop('sowing_frames', None)
+    if frames:
+        st.markdown(render_sowing_svg(frames), unsafe_allow_html=True)
+    elif BOARD_RENDERER == "svg":
+        st.markdown(render_board_svg(houses), unsafe_allow_html=True)
+    else:
+        st.image(board_png(houses), width="stretch")
+
+# Build an engine position from the session state
+def current_state():
+    return engine.State(st.session_state.houses, st.session_state.current_player, st.session_state.round)
+
+# Write an engine position back into the session state
+def store_state(state):
+    st.session_state.houses = state.to_list()
+    st.session_state.current_player = state.player
+    st.session_state.round = state.round
+
+# Make a move and queue its sowing trace for playback on the next render
+def play_move(state, index):
+    if 'sowing_frames' not in st.session_state:
+        st.session_state.sowing_frames = [tuple(state.houses)]
+    st.session_state.sowing_frames += engine.sowing_trace(state, index)
+    st.session_state.setdefault('move_history', []).append(index)
+    engine.make_move(state, index)
+
+# Move buttons call this before the game_board fragment reruns, so one
+# click re-executes only the fragment, with the new position already stored
+def move_pebbles(index):
+    state = current_state()
+    if index not in engine.legal_moves(state):
+        return  # Ignore empty houses
 
+    st.session_state.bot_log = []
+    play_move(state, index)
+    store_state(state)
 
-# Define House Indexes for Each Player
-P1_HOUSES = [5, 4, 3, 2, 1]  # Player 1's Houses (left to right)
-P2_HOUSES = [7, 8, 9, 10, 11]  # Player 2's Houses (right to left)
+    # **Extra Turn Rule**: if the last stone lands in the player's own ulo, they keep the turn
+    # **Call bot_move() if it's a bot's turn**
+    if state.player == 2 and st.session_state.players[1] == "Bot":
+        bot_move()
 
-P1_ULO = 6  # Player 1's ulo (head)
-P2_ULO = 12  # Player 2's ulo (head)
 
-def move_pebbles(index):
-    stones = st.session_state.houses[index]
-    if stones == 0:
-        return  # Ignore empty houses
+# State contract for the game page:
+#   - the full page reads players and avatars, which do not change during a game;
+#   - game_board owns houses, current_player, round, sowing_frames, bot_log and
+#     move_history, which only move_pebbles and bot_move write.
+# A move therefore reruns game_board alone; the whole page reruns only to
+# switch to the game over page.
+@st.fragment
+def game_board():
+    # The bot opens when it was picked to go first
+    if (st.session_state.current_player == 2 and st.session_state.players[1] == "Bot"
+            and not engine.is_terminal(current_state(), MAX_ROUNDS)):
+        bot_move()
 
-    st.session_state.houses[index] = 0  # Remove stones from selected house
-    pos = index  # Start placing pebbles from the next position
+    # Display Round Announcement
+    st.markdown(f"<h1 class='round-banner' style='text-align: center; color: red;'>Round {st.session_state.round}</h1>", unsafe_allow_html=True)
 
-    while stones > 0:
-        pos = (pos + 1) % 13  # Wrap around correctly (0-12)
+    # Display game board with dynamic input for houses
+    st.write("Game Board:")
+    show_board(st.session_state.houses)
 
-        # Skip opponent's ulo
-        if (st.session_state.current_player == 1 and pos == P2_ULO) or \
-           (st.session_state.current_player == 2 and pos == P1_ULO):
-            pos = (pos + 1) % 13  # Move past the ulo
-            continue  
+    # **Render Buttons for Player Moves**
+    houses = P1_HOUSES if st.session_state.current_player == 1 else P2_HOUSES
+    prefix = "p1" if st.session_state.current_player == 1 else "p2"
+    cols = st.columns(5)
+    for i in range(5):
+        cols[i].button(f"Move {i+1}", key=f"{prefix}_{i}", on_click=move_pebbles, args=(houses[i],))
 
-        st.session_state.houses[pos] += 1
-        stones -= 1
+    for line in st.session_state.get('bot_log', []):
+        st.write(line)
 
-    # **Extra Turn Rule**: If last stone lands in player's own ulo
-    if (st.session_state.current_player == 1 and pos == P1_ULO) or \
-       (st.session_state.current_player == 2 and pos == P2_ULO):
-        return  # Player keeps turn
+    # The alpha-beta bot searches its replies while the player thinks
+    if (st.session_state.current_player == 1 and st.session_state.players[1] == "Bot"
+            and st.session_state.get('bot_engine', "Alpha-Beta") == "Alpha-Beta"
+            and not engine.is_terminal(current_state(), MAX_ROUNDS)):
+        session_ponderer().start(current_state(), bot_factory())
 
-    # **Switch Turn**
-    st.session_state.current_player = 3 - st.session_state.current_player
-    st.session_state.round += 1
-    
-    # **Call bot_move() if it's a bot's turn**
-    if st.session_state.current_player == 2 and st.session_state.players[1] == "Bot":
-        bot_move()
-    st.rerun()
+    # Fetch ulo (head) scores correctly
+    p1_score = st.session_state.houses[P1_ULO]
+    p2_score = st.session_state.houses[P2_ULO]
+    st.markdown(f"<h3 style='text-align: center;'>{st.session_state.players[0]}: {p1_score} &nbsp;|&nbsp; "
+                f"{st.session_state.players[1]}: {p2_score}</h3>", unsafe_allow_html=True)
+
+    # End game after 5 rounds (or when the player to move has no stones left)
+    if engine.is_terminal(current_state(), MAX_ROUNDS):
+        # Saved once per game: the page can be reopened on a finished board (sidebar, Game Mechanics)
+        if not st.session_state.get('game_saved'):
+            save_finished_game(st.session_state.players, st.session_state.get('move_history', []),
+                               st.session_state.get('first_player', 1), st.session_state.houses)
+            st.session_state.game_saved = True
+        st.session_state.page = 'game_over'
+        st.rerun()
+
+
+# Finished games are appended to binary segment files, shared by every session
+@st.cache_resource
+def game_recorder():
+    return GameRecorder()
+
+# Persistent leaderboard (SQLite), shared by every session
+@st.cache_resource
+def leaderboard():
+    return Leaderboard()
+
+def save_finished_game(players, moves, first_player, houses):
+    game_recorder().append(players, moves, first_player)
+    leaderboard().record(players[0], players[1], houses[P1_ULO], houses[P2_ULO])
 
 
 def game_page():
@@ -353,76 +438,69 @@ def game_page():
     with col2:
         st.title("Sungka Game")
 
-    # Display Round Announcement
-    st.markdown(f"<h1 style='text-align: center; color: red;'>Round {st.session_state.round}</h1>", unsafe_allow_html=True)
-    time.sleep(2)
-
     # Center Player 1 Above the Board
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        st.image(st.session_state.avatars.get(st.session_state.players[0], ""), width=250)
+        show_asset(st.session_state.avatars.get(st.session_state.players[0], "AV1.gif"), 250)
         st.subheader(st.session_state.players[0])
 
-    # Display game board with dynamic input for houses
-    st.write("Game Board:") 
-    st.pyplot(draw_sungka_board())
+    game_board()
 
-  # **Render Buttons for Player Moves**
-    cols = st.columns(5)
-
-    for i in range(5):
-        if st.session_state.current_player == 1:
-            if cols[i].button(f"Move {i+1}", key=f"p1_{i}"):
-                move_pebbles(P1_HOUSES[i])  # Uses the predefined house indexes
-        else:
-            if cols[i].button(f"Move {i+1}", key=f"p2_{i}"):
-                move_pebbles(P2_HOUSES[i])  # Uses the predefined house indexes
     # Center Player 2 Below the Board
     col4, col5, col6 = st.columns([1, 2, 1])
     with col5:
-        st.image(st.session_state.avatars.get(st.session_state.players[1], ""), width=250)
+        show_asset(st.session_state.avatars.get(st.session_state.players[1], "AV1.gif"), 250)
         st.subheader(st.session_state.players[1])
 
-  
-
-   # End game after 5 rounds
-       # Fetch ulo (head) scores correctly
-    p1_score = st.session_state.houses[P1_ULO]
-    p2_score = st.session_state.houses[P2_ULO]
-
-    if st.session_state.round > 5:
-        st.session_state.page = 'game_over'
-        st.write("Game Over! Final Scores:")
-        st.write(f"Player 1: {p1_score} marbles")
-        st.write(f"Player 2: {p2_score} marbles")
-        if p1_score > p2_score:
-            st.write("Player 1 wins!")
-        elif p2_score> p1_score:
-            st.write("Player 2 wins!")
-        else:
-            st.write("It's a tie!")
-
-    # Bot move handling (for 1 Player mode)
+# One transposition table per process, shared by the bots of every session
+@st.cache_resource
+def shared_transposition_table():
+    return TranspositionTable(size_mb=16)
+
+# Opening book built offline with sungka_book.py (None when not built)
+@st.cache_resource
+def opening_book():
+    return load_book()
+
+# Threads pondering the bot's replies, shared by every session
+@st.cache_resource
+def ponder_executor():
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="ponder")
+
+# One ponderer per session; it stops its search when the session is dropped
+def session_ponderer():
+    if 'ponderer' not in st.session_state:
+        st.session_state.ponderer = Ponderer(ponder_executor(), MAX_ROUNDS)
+    return st.session_state.ponderer
+
+# Bot constructor for the chosen difficulty; takes the session settings now,
+# since pondering threads cannot read st.session_state
+def bot_factory():
+    difficulty = st.session_state.difficulty
+    bot_engine = st.session_state.get('bot_engine', "Alpha-Beta")
+    tt, book = shared_transposition_table(), opening_book()
+    return lambda stop=None: bot_for_difficulty(difficulty, MAX_ROUNDS, bot_engine, tt, book, stop=stop)
+
+# Bot move handling (for 1 Player mode)
+# Runs inside a button callback, so its messages go to bot_log for game_board to show
 def bot_move():
-        st.write("Bot's turn...")
-
-        # Select a non-empty house randomly from P2_HOUSES
-        available_moves = [i for i in P2_HOUSES if st.session_state.houses[i] > 0]
-        if available_moves:  # If there are valid moves
-            house_choice_bot = random.choice(available_moves)  # Select randomly
-            st.write(f"Bot selects House {house_choice_bot} and moves the marbles...")
-            move_pebbles(house_choice_bot)
-        else:
-            st.write("Bot has no valid moves, skipping turn.")
-        move_pebbles(house_choice_bot) 
-
-        # After updating the Bot's move, display the updated board
-        st.write(f"Updated P2 Houses: {st.session_state.P2_HOUSES}")
-        st.write(f"Updated P2 Head: {st.session_state.P2_ULO}")
-
-        # Proceed to the next round
-        st.session_state.round += 1
-        # Game Over Page
+    state = current_state()
+    if state.player != 2 or engine.is_terminal(state, MAX_ROUNDS):
+        return  # the player's move ended the game
+    log = st.session_state.bot_log = ["Bot's turn..."]
+
+    # Search with the budget of the chosen difficulty; keep moving on extra turns
+    bot = bot_factory()()
+    ponderer = session_ponderer()
+    while state.player == 2 and not engine.is_terminal(state, MAX_ROUNDS):
+        # Usually found while the player was thinking; otherwise search now, without pondering alongside
+        house_choice_bot = ponderer.take(state)
+        if house_choice_bot is None:
+            ponderer.cancel()
+            house_choice_bot = bot.choose_move(state)
+        log.append(f"Bot selects House {house_choice_bot} and moves the marbles...")
+        play_move(state, house_choice_bot)
+    store_state(state)
 
 
 def game_over_page():
@@ -441,19 +519,168 @@ def game_over_page():
         winner = "It's a tie!"
 
     # Display game results
-    st.markdown(f"<h1 style='text-align: center; color: green;'>Game Over</h1>", unsafe_allow_html=True)
-    time.sleep(2)
+    st.markdown(f"<h1 class='round-banner' style='text-align: center; color: green;'>Game Over</h1>", unsafe_allow_html=True)
     
     st.markdown(f"<h2 style='text-align: center;'>Winner: {winner}</h2>", unsafe_allow_html=True)
     st.markdown(f"<h3 style='text-align: center;'>Player 1: {p1_score} marbles</h3>", unsafe_allow_html=True)
     st.markdown(f"<h3 style='text-align: center;'>Player 2: {p2_score} marbles</h3>", unsafe_allow_html=True)
 
+    # Ratings after this game (updated when the result was recorded)
+    for name in st.session_state.players:
+        entry = leaderboard().player(name)
+        if entry is not None and entry["rating"] is not None:
+            st.markdown(f"<p style='text-align: center;'>{name}: rating {entry['rating']:.0f} "
+                        f"± {2 * entry['rd']:.0f}</p>", unsafe_allow_html=True)
+
     # Play Again button
     if st.button("Play Again"):
         st.session_state.page = 'home'
         st.rerun()
 
 
+# Live online games shared by every session; the store records each finished game once
+@st.cache_resource
+def game_store():
+    return GameStore(MAX_ROUNDS, on_finish=lambda result: save_finished_game(**result))
+
+# While a page waits for the opponent, it touches st.session_state this
+# often: Streamlit stops a run at such a call when the session has a click
+# to handle (Leave Game) or has been closed. The opponent's move itself
+# wakes the page at once.
+ONLINE_HEARTBEAT_SECONDS = 2
+
+def online_lobby_page():
+    st.title("Online Lobby")
+    name = st.session_state.get('online_name', "Player 1")
+    st.write(f"Playing as **{name}**")
+
+    if st.button("Create Game"):
+        game, token = game_store().create(name)
+        st.session_state.online = {"game": game.id, "token": token, "seat": 1}
+        st.session_state.page = 'online_game'
+        st.rerun()
+
+    st.subheader("Open Games")
+    open_games = game_store().open_games()
+    if not open_games:
+        st.write("No open games yet. Create one and ask your opponent to join it.")
+    for game in open_games:
+        col1, col2 = st.columns([3, 1])
+        col1.write(f"Game `{game.id}` hosted by {game.seats[1]}")
+        if col2.button("Join", key=f"join_{game.id}"):
+            try:
+                seat, token = game.join(name)
+            except ValueError as e:
+                st.error(str(e))
+                continue
+            st.session_state.online = {"game": game.id, "token": token, "seat": seat}
+            st.session_state.page = 'online_game'
+            st.rerun()
+
+    # Anyone can watch a game in progress, read-only
+    st.subheader("Games in Progress")
+    live_games = game_store().live_games()
+    if not live_games:
+        st.write("No games in progress.")
+    for game in live_games:
+        col1, col2 = st.columns([3, 1])
+        col1.write(f"Game `{game.id}`: {game.seats[1]} vs {game.seats[2]}")
+        if col2.button("Watch", key=f"watch_{game.id}"):
+            st.session_state.online = {"game": game.id, "token": None, "seat": None}
+            st.session_state.page = 'online_game'
+            st.rerun()
+
+# The live game with the session's seat (None for spectators); game is None when it is gone
+def online_game():
+    online = st.session_state.get('online')
+    game = game_store().get(online["game"]) if online else None
+    return game, online
+
+def online_move(index):
+    game, online = online_game()
+    if game is None:
+        return
+    try:
+        game.move(online["token"], index)
+    except ValueError:
+        pass  # Ignore empty houses and clicks on a stale board
+
+def leave_online_game():
+    game, online = online_game()
+    if game is not None and online["token"] is not None:
+        game.leave(online["token"])
+    st.session_state.pop('online', None)
+    navigate_to('online_lobby')
+
+def draw_online_game(snapshot, seat):
+    names = snapshot["seats"]
+    if names[2] is None:
+        st.write("Waiting for an opponent to join...")
+        return
+    st.markdown(f"<h1 class='round-banner' style='text-align: center; color: red;'>Round {snapshot['round']}</h1>", unsafe_allow_html=True)
+    st.subheader(names[1])
+    show_board(snapshot["houses"])
+    st.subheader(names[2])
+    if snapshot["player"] != seat and not snapshot["finished"]:
+        st.write(f"Waiting for {names[snapshot['player']]} to move...")
+    st.markdown(f"<h3 style='text-align: center;'>{names[1]}: {snapshot['houses'][P1_ULO]} &nbsp;|&nbsp; "
+                f"{names[2]}: {snapshot['houses'][P2_ULO]}</h3>", unsafe_allow_html=True)
+
+# Every session at the table runs this fragment. While it is not the
+# session's turn (and always for spectators), the run blocks on the game's
+# condition and redraws the board in place whenever the game changes, so
+# waiting costs no reruns at all. It returns once the session has to act:
+# the player to move gets the move buttons, and a click reruns only this
+# fragment. All viewers draw from the game's shared snapshot and the shared
+# board render cache, so a move is rendered once however many watch.
+@st.fragment
+def online_board():
+    game, online = online_game()
+    if game is None:
+        st.write("This game is no longer available.")
+        st.button("Back to Lobby", on_click=lambda: navigate_to('online_lobby'))
+        return
+    seat = online["seat"]
+    st.caption(f"Game code: {game.id} · " + (f"you are Player {seat}" if seat else "watching"))
+    view = st.empty()
+    moves = st.container()
+    st.button("Leave Game" if seat else "Stop Watching", on_click=leave_online_game)
+
+    snapshot = game.snapshot()
+    while True:
+        with view.container():
+            draw_online_game(snapshot, seat)
+        if snapshot["finished"] or (snapshot["seats"][2] is not None and snapshot["player"] == seat):
+            break
+        while not game.wait_for_change(snapshot["version"], ONLINE_HEARTBEAT_SECONDS):
+            st.session_state.get('online')  # a pending rerun or a closed session stops the run here
+        snapshot = game.snapshot()
+
+    names = snapshot["seats"]
+    if snapshot["abandoned_by"] is not None:
+        st.write(f"{names[snapshot['abandoned_by']]} left the game.")
+    elif snapshot["finished"]:
+        # Show the result on the regular game over page. The store has recorded
+        # the game already, so the local board starts afresh and must not save it again
+        reset_board()
+        st.session_state.houses = list(snapshot["houses"])
+        st.session_state.players = [names[1], names[2]]
+        st.session_state.game_saved = True
+        st.session_state.pop('online', None)
+        st.session_state.page = 'game_over'
+        st.rerun()
+    else:
+        houses = P1_HOUSES if seat == 1 else P2_HOUSES
+        cols = moves.columns(5)
+        for i in range(5):
+            cols[i].button(f"Move {i+1}", key=f"online_{i}", on_click=online_move, args=(houses[i],))
+
+def online_game_page():
+    col1, col2, col3 = st.columns([1, 2, 1])  # Middle column is wider
+    with col2:
+        st.title("Sungka Game")
+    online_board()
+
 
 # Page Navigation
 if st.session_state.page == 'home':
@@ -468,18 +695,27 @@ elif st.session_state.page == 'game':
     game_page()
 elif st.session_state.page == 'game_over':
     game_over_page()
+elif st.session_state.page == 'online_lobby':
+    online_lobby_page()
+elif st.session_state.page == 'online_game':
+    online_game_page()
 # Leaderboard
 if st.session_state.page == 'leaderboard':
     st.header("Leaderboard")
-    # Retrieve actual player names and scores from session state
-    player1_name = st.session_state.players[0]
-    player2_name = st.session_state.players[1]
-    p1_score = st.session_state.houses[P1_ULO]  # Get Player 1's ulo (head)
-    p2_score = st.session_state.houses[P2_ULO]  # Get Player 2's ulo (head)
-
-    # Display Corrected Scores
-    st.write(f"**{player1_name}:** {p1_score} points")
-    st.write(f"**{player2_name}:** {p2_score} points")
+    # Top players across every session, ranked by wins and then points
+    top_players = leaderboard().top(10)
+    if top_players:
+        st.table([{"Rank": i + 1, "Player": row["name"], "Games": row["games"], "Wins": row["wins"],
+                   "Draws": row["draws"], "Losses": row["losses"], "Points": row["points"]}
+                  for i, row in enumerate(top_players)])
+    else:
+        st.write("No games played yet.")
+
+    # Rank of this session's players
+    for name in st.session_state.players:
+        entry = leaderboard().player(name)
+        if entry is not None:
+            st.write(f"**{name}:** rank {entry['rank']}, {entry['wins']} wins in {entry['games']} games, {entry['points']} points")
 
     # Restart Game Button
     if st.button("Restart Game"):
@@ -0,0 +1,89 @@
+"""Cold-start benchmark for the Streamlit app scripts.
+
+    python bench_startup.py [--reruns N] [script ...]
+
+Every measurement runs in a fresh interpreter.  It reports the import time
+of the heavy libraries, then for each script and page the first (cold)
+run, the average warm rerun, and which heavy libraries the page loaded.
+Scripts are run headless with streamlit.testing.v1.AppTest.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+HEAVY_MODULES = ["streamlit", "numpy", "matplotlib", "PIL"]
+PAGES = ["home", "player_setup", "math_challenge", "game"]
+
+IMPORT_PROBE = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+RUN_PROBE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+script, page, reruns, heavy = sys.argv[1], sys.argv[2], int(sys.argv[3]), sys.argv[4].split(",")
+start = time.perf_counter()
+at = AppTest.from_file(script, default_timeout=120)
+at.session_state.page = page
+at.session_state.players = ["Player 1", "Bot"]
+at.session_state.avatars = {"Player 1": "AV1.gif", "Bot": "AV2.gif"}
+at.session_state.difficulty = "Medium"
+at.run()
+first = time.perf_counter() - start
+warm = []
+for _ in range(reruns):
+    start = time.perf_counter()
+    at.run()
+    warm.append(time.perf_counter() - start)
+print(json.dumps({
+    "first": first,
+    "warm": sum(warm) / len(warm) if warm else None,
+    "loaded": [m for m in heavy if m in sys.modules and m != "streamlit"],
+    "error": bool(at.exception),
+}))
+"""
+
+
+def import_time(module):
+    out = subprocess.run([sys.executable, "-c", IMPORT_PROBE.format(module=module)],
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout)
+
+
+def page_times(script, page, reruns):
+    out = subprocess.run([sys.executable, "-c", RUN_PROBE, os.path.abspath(script), page,
+                          str(reruns), ",".join(HEAVY_MODULES)],
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure import and first-render time of the app scripts.")
+    parser.add_argument("scripts", nargs="*", default=["Sungkaboard.py", "Sungka.py"])
+    parser.add_argument("--reruns", type=int, default=5, help="warm reruns to average per page")
+    args = parser.parse_args(argv)
+
+    print("Import time (fresh interpreter)")
+    for module in HEAVY_MODULES:
+        print(f"  {module:<12} {import_time(module) * 1000:8.1f} ms")
+
+    for script in args.scripts:
+        print(f"\n{script}")
+        print(f"  {'page':<16} {'first run':>10} {'warm rerun':>11}  loaded")
+        for page in PAGES:
+            result = page_times(script, page, args.reruns)
+            warm = f"{result['warm'] * 1000:8.1f} ms" if result["warm"] is not None else "-"
+            error = "  (script error)" if result["error"] else ""
+            print(f"  {page:<16} {result['first'] * 1000:7.1f} ms {warm:>11}  "
+                  f"{', '.join(result['loaded']) or '-'}{error}")
+
+
+if __name__ == "__main__":
+    main()
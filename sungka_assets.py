@@ -0,0 +1,98 @@
+"""Avatar and animation assets, downscaled once and kept in memory.
+
+The GIFs in the repo are up to 3.3 MB at full size while the pages show
+them 100-250 px wide.  AssetStore transcodes each (file, width) pair once
+into an animated GIF at exactly that width and serves the bytes from
+memory afterwards; the transcoded files are kept on disk so a restarted
+server starts warm.  GIF is kept as the output format because st.image
+passes GIF bytes that already fit the requested width through untouched;
+other formats (WebP included) are re-encoded to a still image.
+"""
+
+import io
+import os
+import threading
+
+AVATARS = [f"AV{i + 1}.gif" for i in range(9)]  # 9 avatars available
+
+
+def scale_gif(path, width):
+    """Animated GIF bytes of ``path`` resized to ``width`` pixels wide."""
+    from PIL import Image, ImageSequence  # only needed when an asset is first transcoded
+
+    with Image.open(path) as image:
+        if image.width <= width:
+            with open(path, "rb") as f:
+                return f.read()
+        height = max(1, round(image.height * width / image.width))
+        frames, durations = [], []
+        for frame in ImageSequence.Iterator(image):
+            durations.append(frame.info.get("duration", image.info.get("duration", 100)))
+            frames.append(frame.convert("RGBA").resize((width, height), Image.LANCZOS))
+        loop = image.info.get("loop", 0)
+
+    buf = io.BytesIO()
+    frames[0].save(buf, format="GIF", save_all=True, append_images=frames[1:],
+                   duration=durations, loop=loop, disposal=2, optimize=True)
+    return buf.getvalue()
+
+
+class AssetStore:
+    """Thread-safe in-memory store of downscaled assets, one per (path, width).
+
+    Transcoded files are also written to ``cache_dir`` (when given), so a
+    restarted process reads them back instead of transcoding again.
+    """
+
+    def __init__(self, cache_dir=".asset_cache"):
+        self.cache_dir = cache_dir
+        self._assets = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _load(self, path, width):
+        if not self.cache_dir:
+            return scale_gif(path, width)
+        name, _ = os.path.splitext(os.path.basename(path))
+        cached = os.path.join(self.cache_dir, f"{name}-{width}.gif")
+        if os.path.exists(cached) and os.path.getmtime(cached) >= os.path.getmtime(path):
+            with open(cached, "rb") as f:
+                return f.read()
+        asset = scale_gif(path, width)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{cached}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(asset)
+            os.replace(tmp, cached)
+        except OSError:
+            pass  # read-only deployments still get the in-memory copy
+        return asset
+
+    def get(self, path, width):
+        key = (path, width)
+        asset = self._assets.get(key)
+        if asset is not None:
+            return asset
+        with self._lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+        # Sessions asking for the same asset wait for a single transcode
+        with key_lock:
+            asset = self._assets.get(key)
+            if asset is None:
+                asset = self._assets[key] = self._load(path, width)
+        return asset
+
+    def preload(self, paths, widths):
+        for path in paths:
+            for width in widths:
+                self.get(path, width)
+
+    def preload_async(self, paths, widths):
+        """Transcode in a background thread so the first page view is not blocked."""
+        thread = threading.Thread(target=self.preload, args=(paths, widths), daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self):
+        return {"assets": len(self._assets), "bytes": sum(map(len, self._assets.values()))}
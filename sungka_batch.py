@@ -0,0 +1,129 @@
+"""Vectorized Sungka simulator: N games advanced together in NumPy arrays.
+
+Follows the same rules as sungka_engine's standard board (skip the opponent's ulo and the
+unused slot, extra turn when the last stone lands in the player's own ulo).
+A move is sown without a per-stone loop: every slot of the player's sowing
+cycle gets ``stones // cycle_length`` stones, and the first
+``stones % cycle_length`` slots after the pit get one more.
+"""
+
+import numpy as np
+
+import sungka_engine as engine
+
+
+def _cycle(player):
+    # Slots the player sows into, in order, starting after slot 0
+    cycle = []
+    pos = engine.NEXT[player][engine.UNUSED_SLOT]
+    while pos not in cycle:
+        cycle.append(pos)
+        pos = engine.NEXT[player][pos]
+    return cycle
+
+
+CYCLE_LEN = len(_cycle(1))
+
+# Row p holds player p's sowing cycle (row 0 is padding so players index directly)
+CYCLES = np.array([_cycle(1), _cycle(1), _cycle(2)], dtype=np.intp)
+CYCLE_POS = np.full((3, engine.NUM_SLOTS), -1, dtype=np.intp)
+for _player in (1, 2):
+    CYCLE_POS[_player, CYCLES[_player]] = np.arange(CYCLE_LEN)
+
+SIDE = np.array([engine.P1_HOUSES, engine.P1_HOUSES, engine.P2_HOUSES], dtype=np.intp)
+ULO = np.array([-1, engine.P1_ULO, engine.P2_ULO], dtype=np.intp)
+OWNER = np.array(engine.OWNER, dtype=np.intp)
+
+
+class BatchBoard:
+    """N Sungka games stored as an ``(N, 13)`` int16 array.
+
+    ``player`` and ``round`` hold the player to move and the round of each
+    game; ``done`` marks games whose player to move has no stones left.
+    """
+
+    def __init__(self, n, houses=engine.INITIAL_HOUSES, player=1):
+        self.houses = np.tile(np.asarray(houses, dtype=np.int16), (n, 1))
+        self.player = np.full(n, player, dtype=np.int8)
+        self.round = np.ones(n, dtype=np.int32)
+        self.done = np.zeros(n, dtype=bool)
+        self._update_done(np.arange(n))
+
+    @classmethod
+    def from_states(cls, states):
+        board = cls(len(states))
+        for i, state in enumerate(states):
+            board.houses[i] = state.houses
+            board.player[i] = state.player
+            board.round[i] = state.round
+        board._update_done(np.arange(len(states)))
+        return board
+
+    def __len__(self):
+        return len(self.houses)
+
+    def state(self, i):
+        """Game ``i`` as an engine State."""
+        return engine.State(self.houses[i].tolist(), int(self.player[i]), int(self.round[i]))
+
+    def scores(self):
+        return self.houses[:, engine.P1_ULO], self.houses[:, engine.P2_ULO]
+
+    def winners(self):
+        """1 or 2 for the player with more stones in their ulo, 0 for a tie."""
+        p1, p2 = self.scores()
+        return np.where(p1 > p2, 1, np.where(p2 > p1, 2, 0)).astype(np.int8)
+
+    def legal_mask(self):
+        """``(N, 5)`` bool array of non-empty houses of the player to move, in sowing order."""
+        rows = np.arange(len(self))[:, None]
+        return self.houses[rows, SIDE[self.player]] > 0
+
+    def random_moves(self, rng=None):
+        """A uniformly random legal pit for every game still in play (-1 for finished games)."""
+        rng = np.random.default_rng() if rng is None else rng
+        legal = self.legal_mask()
+        choice = np.argmax(rng.random(legal.shape) * legal, axis=1)
+        pits = SIDE[self.player, choice]
+        pits[self.done] = -1
+        return pits
+
+    def step(self, pits):
+        """Sow ``pits[i]`` in every unfinished game i; entries for finished games are ignored."""
+        pits = np.asarray(pits, dtype=np.intp)
+        rows = np.flatnonzero(~self.done)
+        if not len(rows):
+            return
+        pits = pits[rows]
+        player = self.player[rows].astype(np.intp)
+        start = CYCLE_POS[player, pits]
+        counts = self.houses[rows, pits]
+        if np.any((pits < 0) | (OWNER[pits] != player) | (counts <= 0)):
+            raise ValueError("Illegal move in batch step")
+
+        self.houses[rows, pits] = 0
+        start += 1
+        laps, rest = np.divmod(counts, CYCLE_LEN)
+        offset = (np.arange(CYCLE_LEN)[None, :] - start[:, None]) % CYCLE_LEN
+        cols = CYCLES[player]
+        self.houses[rows[:, None], cols] += (laps[:, None] + (offset < rest[:, None])).astype(np.int16)
+
+        # Extra turn when the last stone lands in the player's own ulo
+        last = cols[np.arange(len(rows)), (start + counts - 1) % CYCLE_LEN]
+        switch = rows[last != ULO[player]]
+        self.player[switch] = 3 - self.player[switch]
+        self.round[switch] += 1
+        self._update_done(rows)
+
+    def play_out(self, rng=None, max_rounds=None):
+        """Play random moves until every game ends and return the winners."""
+        rng = np.random.default_rng() if rng is None else rng
+        while not self.done.all():
+            self.step(self.random_moves(rng))
+            if max_rounds is not None:
+                self.done |= self.round > max_rounds
+        return self.winners()
+
+    def _update_done(self, rows):
+        side = SIDE[self.player[rows]]
+        self.done[rows] = self.houses[rows[:, None], side].sum(axis=1) == 0
@@ -0,0 +1,171 @@
+"""Opening book: precomputed best moves for the first plies of the game.
+
+Build it offline:
+
+    python sungka_book.py --plies 6 --depth 12 --out opening_book.bin
+
+The book is only valid for the round limit it was built with; the default
+``--max-rounds 5`` matches the apps (``--max-rounds 0`` builds one for games
+without a limit).
+
+The builder enumerates every position reachable in ``--plies`` moves from
+the standard start (either player moving first), searches each one with
+AlphaBetaBot and writes fixed-size records sorted by key.  OpeningBook
+memory-maps the file and binary-searches it, so lookups copy nothing and
+the file is shared between processes by the OS page cache.
+
+File layout (little-endian header, big-endian keys so byte order sorts):
+
+    header  16 bytes   magic b"SKBK", version, max_rounds (0 = none), count
+    record  16 bytes   packed position (12 bytes), round (0 when max_rounds
+                       is 0), best move (1 byte), score (int16)
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import sungka_engine as engine
+from sungka_bot import AlphaBetaBot
+
+MAGIC = b"SKBK"
+VERSION = 1
+HEADER = struct.Struct("<4sBBxxI4x")
+RECORD_SIZE = 16
+KEY_SIZE = 13
+CODE_BYTES = 12
+
+DEFAULT_BOOK_PATH = "opening_book.bin"
+DEFAULT_MAX_ROUNDS = 5  # the apps' round limit
+
+
+def book_key(state, max_rounds=None):
+    """13-byte key: packed position, then the round when a round limit applies."""
+    round_byte = min(state.round, 255) if max_rounds else 0
+    return state.packed().to_bytes(CODE_BYTES, "big") + bytes((round_byte,))
+
+
+class OpeningBook:
+    """Read-only, memory-mapped opening book."""
+
+    def __init__(self, path=DEFAULT_BOOK_PATH):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, max_rounds, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a Sungka opening book")
+        self.max_rounds = max_rounds or None
+        self.count = count
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        self._mmap.close()
+
+    def __len__(self):
+        return self.count
+
+    def lookup(self, state, max_rounds=None):
+        """Return (best move, score) for ``state``, or None when it is out of book."""
+        if max_rounds != self.max_rounds or state.variant is not engine.STANDARD:
+            return None  # the book was built for different rules
+        key = book_key(state, max_rounds)
+        data = self._mmap
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = HEADER.size + mid * RECORD_SIZE
+            probe = data[offset:offset + KEY_SIZE]
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                move, score = struct.unpack_from(">Bh", data, offset + KEY_SIZE)
+                self.hits += 1
+                return move, score
+        self.misses += 1
+        return None
+
+
+def load_book(path=DEFAULT_BOOK_PATH, max_rounds=DEFAULT_MAX_ROUNDS):
+    """OpeningBook for ``path``, or None if no book has been built for ``max_rounds``."""
+    if not os.path.exists(path):
+        return None
+    book = OpeningBook(path)
+    if book.max_rounds != max_rounds:
+        warnings.warn(f"{path} was built for max_rounds={book.max_rounds}, not {max_rounds}; "
+                      f"rebuild it with --max-rounds {max_rounds or 0} to use it")
+        book.close()
+        return None
+    return book
+
+
+def reachable_positions(plies, max_rounds=None):
+    """Every position reachable in up to ``plies`` moves from the start, by book key."""
+    frontier = {}
+    for first_player in (1, 2):
+        state = engine.new_game(first_player)
+        frontier[book_key(state, max_rounds)] = state
+    positions = dict(frontier)
+    for _ in range(plies):
+        next_frontier = {}
+        for state in frontier.values():
+            if engine.is_terminal(state, max_rounds):
+                continue
+            for pit in engine.legal_moves(state):
+                child = engine.apply_move(state, pit)
+                key = book_key(child, max_rounds)
+                if key not in positions:
+                    positions[key] = next_frontier[key] = child
+        frontier = next_frontier
+    return {key: state for key, state in positions.items()
+            if not engine.is_terminal(state, max_rounds)}
+
+
+def _analyse(args):
+    key, code, round, depth, time_budget, max_rounds = args
+    bot = AlphaBetaBot(time_budget, depth, max_rounds)
+    move, score = bot.analyse(engine.State.from_packed(code, round))
+    return key, move, score
+
+
+def build_book(path, plies, depth, time_budget=60.0, max_rounds=None, workers=None):
+    positions = reachable_positions(plies, max_rounds)
+    jobs = [(key, state.packed(), state.round, depth, time_budget, max_rounds)
+            for key, state in positions.items()]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = sorted(executor.map(_analyse, jobs, chunksize=16))
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, max_rounds or 0, len(results)))
+        for key, move, score in results:
+            f.write(key + struct.pack(">Bh", move, score))
+    os.replace(tmp_path, path)
+    return len(results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the Sungka opening book.")
+    parser.add_argument("--plies", type=int, default=6, help="moves from the start position to cover")
+    parser.add_argument("--depth", type=int, default=12, help="search depth per position")
+    parser.add_argument("--time", type=float, default=60.0, help="search time limit per position (s)")
+    parser.add_argument("--max-rounds", type=int, default=DEFAULT_MAX_ROUNDS,
+                        help="round limit of the rules (default: the apps' 5; 0 for none)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--out", default=DEFAULT_BOOK_PATH)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    count = build_book(args.out, args.plies, args.depth, args.time, args.max_rounds or None, args.workers)
+    print(f"Wrote {count} positions to {args.out} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Sungka bots built on sungka_engine.
+
+AlphaBetaBot runs a negamax alpha-beta search with iterative deepening
+under a hard wall-clock budget per move.  Scores are always from the point
+of view of the player to move; the sign only flips when the turn passes, so
+extra-turn chains are searched as consecutive moves by the same player.
+"""
+
+import random
+import time
+
+import sungka_engine as engine
+from sungka_tt import EXACT, LOWER, UPPER
+
+INF = 1_000_000
+WIN_SCORE = 10_000
+
+# Difficulty from difficulty_selection_page -> (seconds per move, max depth)
+DIFFICULTY_BUDGETS = {
+    "Easy": (0.01, 2),
+    "Medium": (0.05, 6),
+    "Hard": (0.25, 64),
+}
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+def _round_key(round):
+    # Mixed into the table key when a round limit makes the round matter
+    return (round * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+
+
+def evaluate(state):
+    """Ulo difference for the player to move."""
+    houses = state.houses
+    ulo = state.variant.ulo
+    diff = houses[ulo[1]] - houses[ulo[2]]
+    return diff if state.player == 1 else -diff
+
+
+def outcome_value(margin):
+    """Search score of a finished game won by ``margin`` stones (negative for a loss)."""
+    if margin > 0:
+        return WIN_SCORE + margin
+    if margin < 0:
+        return -WIN_SCORE + margin
+    return 0
+
+
+def terminal_value(state):
+    return outcome_value(evaluate(state))
+
+
+def ordered_moves(state, first=None):
+    """Legal moves with extra-turn moves first, then bigger piles first."""
+    houses = state.houses
+    moves = sorted(engine.legal_moves(state),
+                   key=lambda pit: (not engine.is_extra_turn(state, pit), -houses[pit]))
+    if first in moves:
+        moves.remove(first)
+        moves.insert(0, first)
+    return moves
+
+
+class RandomBot:
+    """Picks a random non-empty house, like the original bot_move."""
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+
+    def choose_move(self, state):
+        return self.rng.choice(engine.legal_moves(state))
+
+
+class AlphaBetaBot:
+    """Iterative-deepening negamax with alpha-beta pruning.
+
+    ``time_budget`` is a hard limit in seconds: the search is abandoned at the
+    deadline and the best move of the last completed depth is returned.
+    ``tt`` is an optional sungka_tt.TranspositionTable, which may be shared
+    with other bots and threads; ``book`` an optional sungka_book.OpeningBook
+    consulted before searching; ``tablebase`` an optional
+    sungka_tablebase.Tablebase giving exact values once few stones remain
+    (only used without a round limit, which the tablebase does not model).
+    ``stop`` is an optional threading.Event that ends the search early, like
+    the deadline; ``stopped`` tells whether the last search was cut short
+    that way.
+    """
+
+    def __init__(self, time_budget=0.05, max_depth=64, max_rounds=None, tt=None, book=None,
+                 tablebase=None, stop=None):
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.max_rounds = max_rounds
+        self.tt = tt
+        self.book = book
+        self.tablebase = tablebase if max_rounds is None else None
+        self.nodes = 0
+        self.depth_reached = 0
+        self.score = 0  # root score of the last completed depth
+        self.deadline = 0.0
+        self.stop = stop
+        self.stopped = False
+
+    def choose_move(self, state):
+        moves = engine.legal_moves(state)
+        if len(moves) == 1:
+            return moves[0]
+        if self.book is not None:
+            entry = self.book.lookup(state, self.max_rounds)
+            if entry is not None and entry[0] in moves:
+                return entry[0]
+        if self.tablebase is not None and self.tablebase.covers(state):
+            return self.tablebase.best_move(state)
+        return self.analyse(state)[0]
+
+    def analyse(self, state):
+        """Search ``state`` within the budget and return (best move, score)."""
+        self.deadline = time.perf_counter() + self.time_budget
+        self.nodes = 0
+        self.depth_reached = 0
+        self.score = 0
+        self.stopped = False
+        state = state.copy()  # a timeout can leave the search state mid-move
+
+        best_move = ordered_moves(state)[0]
+        for depth in range(1, self.max_depth + 1):
+            try:
+                score, move = self._search_root(state, depth, best_move)
+            except SearchTimeout:
+                self.stopped = self.stop is not None and self.stop.is_set()
+                break
+            best_move = move
+            self.score = score
+            self.depth_reached = depth
+            if abs(score) >= WIN_SCORE:
+                break  # the game is solved from here
+        return best_move, self.score
+
+    def _search_root(self, state, depth, first):
+        player = state.player
+        alpha, beta = -INF, INF
+        best_move = first
+        for pit in ordered_moves(state, first):
+            undo = engine.make_move(state, pit)
+            if state.player == player:
+                score = self._search(state, depth - 1, alpha, beta)
+            else:
+                score = -self._search(state, depth - 1, -beta, -alpha)
+            engine.unmake_move(state, undo)
+            if score > alpha:
+                alpha, best_move = score, pit
+        return alpha, best_move
+
+    def _search(self, state, depth, alpha, beta):
+        self.nodes += 1
+        if not self.nodes & 255 and (time.perf_counter() > self.deadline
+                                     or self.stop is not None and self.stop.is_set()):
+            raise SearchTimeout
+        if engine.is_terminal(state, self.max_rounds):
+            return terminal_value(state)
+        tablebase = self.tablebase
+        if tablebase is not None and tablebase.covers(state):
+            return outcome_value(tablebase.final_margin(state))
+        if depth <= 0:
+            return evaluate(state)
+
+        tt = self.tt
+        tt_move = None
+        if tt is not None:
+            key = state.key if self.max_rounds is None else state.key ^ _round_key(state.round)
+            entry = tt.probe(key)
+            if entry is not None:
+                tt_depth, tt_score, flag, tt_move = entry
+                if tt_depth >= depth:
+                    if flag == EXACT:
+                        return tt_score
+                    if flag == LOWER and tt_score >= beta:
+                        return tt_score
+                    if flag == UPPER and tt_score <= alpha:
+                        return tt_score
+
+        alpha_orig = alpha
+        player = state.player
+        best = -INF
+        best_move = 0
+        for pit in ordered_moves(state, tt_move):
+            undo = engine.make_move(state, pit)
+            if state.player == player:  # extra turn: same side, no sign flip
+                score = self._search(state, depth - 1, alpha, beta)
+            else:
+                score = -self._search(state, depth - 1, -beta, -alpha)
+            engine.unmake_move(state, undo)
+            if score > best:
+                best = score
+                best_move = pit
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if tt is not None:
+            if best <= alpha_orig:
+                flag = UPPER
+            elif best >= beta:
+                flag = LOWER
+            else:
+                flag = EXACT
+            tt.store(key, depth, best, flag, best_move)
+        return best
+
+
+# Bot engines offered in difficulty_selection_page
+BOT_ENGINES = ["Alpha-Beta", "MCTS"]
+
+
+def bot_for_difficulty(difficulty, max_rounds=None, bot_engine="Alpha-Beta", tt=None, book=None,
+                       tablebase=None, stop=None):
+    time_budget, max_depth = DIFFICULTY_BUDGETS.get(difficulty, DIFFICULTY_BUDGETS["Medium"])
+    if bot_engine == "MCTS":
+        from sungka_mcts import MCTSBot  # sungka_mcts imports this module
+        return MCTSBot(time_budget, max_rounds=max_rounds)
+    if difficulty != "Hard":
+        book = tablebase = None  # book openings and perfect endgames are reserved for the Hard bot
+    return AlphaBetaBot(time_budget, max_depth, max_rounds, tt, book, tablebase, stop)
@@ -0,0 +1,479 @@
+"""Headless Sungka rules engine (no Streamlit import).
+
+The standard board uses the same 13-slot layout as
+``st.session_state.houses`` in Sungkaboard.py:
+
+    index 0        unused head slot (never sown into)
+    index 1-5      Player 1 houses, sown towards index 6
+    index 6        Player 1 ulo
+    index 7-11     Player 2 houses, sown towards index 12
+    index 12       Player 2 ulo
+
+Sowing skips the opponent's ulo and the unused slot, and a player who drops
+the last stone in their own ulo moves again.  Other board sizes, starting
+stones and skip rules are described by a Variant (see get_variant); every
+State carries its variant and the functions below follow it.
+"""
+
+import random
+import threading
+from array import array
+from functools import lru_cache
+
+# Zobrist keys are drawn from a fixed seed so they are stable across processes
+ZOBRIST_SEED = 0x5C6B4A
+MASK64 = (1 << 64) - 1
+GOLDEN64 = 0x9E3779B97F4A7C15
+
+SKIPPED_ULO_RULES = ("opponent", "none")
+
+
+def _mix64(x):
+    # splitmix64 finalizer: spreads consecutive inputs over all 64 bits
+    x = (x ^ x >> 30) * 0xBF58476D1CE4E5B9 & MASK64
+    x = (x ^ x >> 27) * 0x94D049BB133111EB & MASK64
+    return x ^ x >> 31
+
+
+class Variant:
+    """Board size, starting stones and skip rule of a Sungka variant.
+
+    Any number of pits per side keeps the layout of the standard board:
+
+        index 0                  unused head slot (never sown into)
+        index 1 .. pits          Player 1 houses
+        index pits + 1           Player 1 ulo
+        index pits + 2 .. 2*pits + 1   Player 2 houses
+        index 2*pits + 2         Player 2 ulo
+
+    ``skipped_ulo`` is "opponent" (the mover skips the other player's ulo,
+    the usual rule) or "none" (stones are sown into both ulos).  All the
+    tables the engine needs are built here once; use get_variant to share
+    them between states.
+    """
+
+    def __init__(self, pits=5, stones=7, skipped_ulo="opponent"):
+        if pits < 1 or stones < 0:
+            raise ValueError(f"Invalid variant: {pits} pits, {stones} stones")
+        if skipped_ulo not in SKIPPED_ULO_RULES:
+            raise ValueError(f"skipped_ulo must be one of {SKIPPED_ULO_RULES}, not {skipped_ulo!r}")
+        self.pits = pits
+        self.stones = stones
+        self.skipped_ulo = skipped_ulo
+
+        num_slots = self.num_slots = 2 * pits + 3
+        self.houses = {1: tuple(range(1, pits + 1)), 2: tuple(range(pits + 2, 2 * pits + 2))}
+        self.ulo = {1: pits + 1, 2: 2 * pits + 2}
+        initial = [0] * num_slots
+        for house in self.houses[1] + self.houses[2]:
+            initial[house] = stones
+        self.initial_houses = tuple(initial)
+
+        # Owner of each slot: 1/2 for a player's houses, 0 for both ulos and the unused slot
+        self.owner = tuple(1 if i in self.houses[1] else 2 if i in self.houses[2] else 0
+                           for i in range(num_slots))
+        # Bitmask of each player's houses (bit i set for slot i)
+        self.side_mask = {player: sum(1 << i for i in houses) for player, houses in self.houses.items()}
+
+        # Slots each player sows into, in order, starting after the unused slot
+        self.cycle = {player: self._sowing_cycle(player) for player in (1, 2)}
+        self.cycle_len = len(self.cycle[1])
+        # Slot each player sows into after a given slot
+        self.next = {player: tuple(self._next_slot(player, pos) for pos in range(num_slots))
+                     for player in (1, 2)}
+        # The cycle_len slots sown after each house, ending with the house itself
+        self.sow_order = {player: {pit: self._sow_order(player, pit) for pit in self.houses[player]}
+                          for player in (1, 2)}
+        # Stones needed from each slot for the last one to land in the player's ulo
+        self.ulo_distance = {player: self._ulo_distance(player) for player in (1, 2)}
+
+        # Packed positions: the player to move in bit 0 (0 = Player 1), then
+        # one stone count per slot, wide enough for every stone in one slot
+        self.max_stones = sum(initial)
+        self.pack_bits = max(7, self.max_stones.bit_length())
+        self.typecode = 'B' if self.max_stones <= 0xFF else 'I'
+
+        # Zobrist keys: a random 64-bit key per slot and one for Player 2 to move.
+        # zobrist[slot][count] mixes the slot's key with the count; the lists
+        # only grow to the largest count met so far, not to max_stones.
+        rng = random.Random(ZOBRIST_SEED)
+        self._slot_keys = tuple(rng.getrandbits(64) for _ in range(num_slots))
+        self.zobrist_p2 = rng.getrandbits(64)
+        self.zobrist = tuple([] for _ in range(num_slots))
+        # XOR delta for one more stone landing in a slot holding n stones
+        self.zobrist_inc = tuple([] for _ in range(num_slots))
+        self.zobrist_size = 0  # counts below this have both tables filled in
+        self._zobrist_lock = threading.Lock()
+        self.grow_zobrist(64)
+
+    def grow_zobrist(self, size):
+        """Fill the Zobrist tables for every stone count below ``size``; returns the new size."""
+        with self._zobrist_lock:
+            if size > self.zobrist_size:
+                size = max(size, 2 * self.zobrist_size)
+                for slot_key, keys, inc in zip(self._slot_keys, self.zobrist, self.zobrist_inc):
+                    keys.extend(_mix64(slot_key + n * GOLDEN64 & MASK64) for n in range(len(keys), size + 1))
+                    inc.extend(keys[n] ^ keys[n + 1] for n in range(len(inc), size))
+                # Published last: readers only index below zobrist_size
+                self.zobrist_size = size
+            return self.zobrist_size
+
+    def _skipped(self, player):
+        if self.skipped_ulo == "opponent":
+            return (0, self.ulo[3 - player])
+        return (0,)
+
+    def _sowing_cycle(self, player):
+        skipped = self._skipped(player)
+        return tuple(pos for pos in range(self.num_slots) if pos not in skipped)
+
+    def _next_slot(self, player, pos):
+        skipped = self._skipped(player)
+        pos = (pos + 1) % self.num_slots
+        while pos in skipped:
+            pos = (pos + 1) % self.num_slots
+        return pos
+
+    def _sow_order(self, player, pit):
+        cycle = self.cycle[player]
+        start = cycle.index(pit) + 1
+        return tuple(cycle[(start + j) % self.cycle_len] for j in range(self.cycle_len))
+
+    def _ulo_distance(self, player):
+        nxt = self.next[player]
+        dist = []
+        for pos in range(self.num_slots):
+            steps = 1
+            pos = nxt[pos]
+            while pos != self.ulo[player]:
+                pos = nxt[pos]
+                steps += 1
+            dist.append(steps)
+        return tuple(dist)
+
+    def __reduce__(self):
+        # Pickle by rules only; the tables are rebuilt (once) in the receiving process
+        return get_variant, (self.pits, self.stones, self.skipped_ulo)
+
+    def __repr__(self):
+        return f"Variant(pits={self.pits}, stones={self.stones}, skipped_ulo={self.skipped_ulo!r})"
+
+
+def get_variant(pits=5, stones=7, skipped_ulo="opponent"):
+    """The shared Variant for these rules (tables are built once per process)."""
+    return _shared_variant(pits, stones, skipped_ulo)
+
+
+@lru_cache(maxsize=None)
+def _shared_variant(pits, stones, skipped_ulo):
+    return Variant(pits, stones, skipped_ulo)
+
+
+STANDARD = get_variant()        # the app's 5-pit board with 7 stones per house
+TRADITIONAL = get_variant(7, 7)  # the traditional 7-pit board
+
+# Module-level names for the standard board
+NUM_SLOTS = STANDARD.num_slots
+
+# Houses in sowing order (the UI keeps its own left-to-right display order)
+P1_HOUSES = STANDARD.houses[1]
+P2_HOUSES = STANDARD.houses[2]
+
+P1_ULO = STANDARD.ulo[1]  # Player 1's ulo (head)
+P2_ULO = STANDARD.ulo[2]  # Player 2's ulo (head)
+UNUSED_SLOT = 0
+
+INITIAL_HOUSES = STANDARD.initial_houses
+
+HOUSES = STANDARD.houses
+ULO = STANDARD.ulo
+OWNER = STANDARD.owner
+SIDE_MASK = STANDARD.side_mask
+NEXT = STANDARD.next
+ULO_DISTANCE = STANDARD.ulo_distance
+CYCLE_LEN = STANDARD.cycle_len  # the unused slot and the opponent's ulo are skipped
+
+# The standard board needs 92 bits per packed code, so packed codes are
+# plain Python ints; the 64-bit Zobrist key is the hash to use for tables.
+PACK_BITS = STANDARD.pack_bits
+PACK_MASK = (1 << PACK_BITS) - 1
+MAX_STONES = STANDARD.max_stones
+
+ZOBRIST = STANDARD.zobrist
+ZOBRIST_P2 = STANDARD.zobrist_p2
+ZOBRIST_INC = STANDARD.zobrist_inc
+
+
+def pack(houses, player, bits=PACK_BITS):
+    """Encode the stone counts and the player to move as one integer."""
+    code = 0
+    for count in reversed(houses):
+        code = code << bits | count
+    return code << 1 | (player - 1)
+
+
+def unpack(code, variant=STANDARD):
+    """Decode a packed position into (houses list, player)."""
+    bits = variant.pack_bits
+    mask = (1 << bits) - 1
+    player = (code & 1) + 1
+    code >>= 1
+    houses = []
+    for _ in range(variant.num_slots):
+        houses.append(code & mask)
+        code >>= bits
+    return houses, player
+
+
+def zobrist(houses, player, variant=STANDARD):
+    """Full Zobrist key of a position; State.key keeps the same value incrementally."""
+    if max(houses) >= variant.zobrist_size:
+        variant.grow_zobrist(max(houses) + 1)
+    keys = variant.zobrist
+    key = variant.zobrist_p2 if player == 2 else 0
+    for i, count in enumerate(houses):
+        key ^= keys[i][count]
+    return key
+
+
+class State:
+    """A game position: the stone counts, the player to move and the round.
+
+    ``stones``, ``mask`` and ``key`` are kept up to date by
+    make_move/unmake_move: ``stones[1]``/``stones[2]`` count the stones in
+    each player's houses (``stones[0]`` the stones in both ulos), bit i of
+    ``mask`` is set when slot i is non-empty and ``key`` is the Zobrist key.
+    ``houses`` defaults to the starting position of ``variant``.
+    """
+
+    __slots__ = ('houses', 'player', 'round', 'stones', 'mask', 'key', 'variant')
+
+    def __init__(self, houses=None, player=1, round=1, variant=STANDARD):
+        if houses is None:
+            houses = variant.initial_houses
+        if len(houses) != variant.num_slots:
+            raise ValueError(f"{variant} has {variant.num_slots} slots, not {len(houses)}")
+        self.variant = variant
+        self.houses = array(variant.typecode, houses)
+        self.player = player
+        self.round = round
+        self.stones = [0, 0, 0]
+        self.mask = 0
+        owner = variant.owner
+        for i, count in enumerate(self.houses):
+            self.stones[owner[i]] += count
+            if count:
+                self.mask |= 1 << i
+        self.key = zobrist(self.houses, player, variant)
+
+    @classmethod
+    def from_packed(cls, code, round=1, variant=STANDARD):
+        houses, player = unpack(code, variant)
+        return cls(houses, player, round, variant)
+
+    def packed(self):
+        return pack(self.houses, self.player, self.variant.pack_bits)
+
+    def copy(self):
+        state = State.__new__(State)
+        state.variant = self.variant
+        state.houses = array(self.houses.typecode, self.houses)
+        state.player = self.player
+        state.round = self.round
+        state.stones = self.stones[:]
+        state.mask = self.mask
+        state.key = self.key
+        return state
+
+    def to_list(self):
+        return self.houses.tolist()
+
+    def __eq__(self, other):
+        if not isinstance(other, State):
+            return NotImplemented
+        return (self.variant is other.variant and self.houses == other.houses
+                and self.player == other.player and self.round == other.round)
+
+    def __repr__(self):
+        extra = "" if self.variant is STANDARD else f", variant={self.variant}"
+        return f"State({self.houses.tolist()}, player={self.player}, round={self.round}{extra})"
+
+
+def new_game(first_player=1, variant=STANDARD):
+    return State(variant.initial_houses, first_player, 1, variant)
+
+
+def legal_mask(state):
+    """Bitmask of the non-empty houses of the player to move."""
+    return state.mask & state.variant.side_mask[state.player]
+
+
+def legal_moves(state):
+    """Non-empty houses of the player to move, in sowing order."""
+    mask = state.mask
+    return [i for i in state.variant.houses[state.player] if mask >> i & 1]
+
+
+def is_terminal(state, max_rounds=None):
+    """The game ends when the player to move has no stones in their houses,
+    or once ``max_rounds`` rounds have been played (the app uses 5)."""
+    if max_rounds is not None and state.round > max_rounds:
+        return True
+    return not state.stones[state.player]
+
+
+def scores(state):
+    ulo = state.variant.ulo
+    return state.houses[ulo[1]], state.houses[ulo[2]]
+
+
+def winner(state):
+    """1 or 2 for the player with more stones in their ulo, 0 for a tie."""
+    p1, p2 = scores(state)
+    if p1 > p2:
+        return 1
+    if p2 > p1:
+        return 2
+    return 0
+
+
+def is_extra_turn(state, pit):
+    """True when sowing ``pit`` ends in the mover's own ulo."""
+    variant = state.variant
+    count = state.houses[pit]
+    length = variant.cycle_len
+    return count > 0 and count % length == variant.ulo_distance[state.player][pit] % length
+
+
+def sowing_path(player, pit, stones, variant=STANDARD):
+    """Yield the slot receiving each stone when ``player`` sows ``stones`` from ``pit``."""
+    nxt = variant.next[player]
+    pos = pit
+    for _ in range(stones):
+        pos = nxt[pos]
+        yield pos
+
+
+def sowing_trace(state, pit):
+    """Boards (as tuples) after lifting ``pit`` and after each stone is dropped.
+
+    ``state`` is left unchanged; the last board is the position after the move.
+    """
+    houses = state.houses.tolist()
+    count = houses[pit]
+    houses[pit] = 0
+    frames = [tuple(houses)]
+    for pos in sowing_path(state.player, pit, count, state.variant):
+        houses[pos] += 1
+        frames.append(tuple(houses))
+    return frames
+
+
+def make_move(state, pit):
+    """Sow ``pit`` in place and return an undo token for unmake_move.
+
+    Full laps around the board are added with arithmetic, so a move visits
+    each slot at most once whatever the number of stones.  The caller is
+    responsible for passing a legal move.
+    """
+    variant = state.variant
+    houses = state.houses
+    stones = state.stones
+    owner = variant.owner
+    player = state.player
+    count = houses[pit]
+    houses[pit] = 0
+    stones[owner[pit]] -= count
+    mask = state.mask & ~(1 << pit)
+    keys = variant.zobrist
+    key = state.key ^ keys[pit][count] ^ keys[pit][0]
+
+    order = variant.sow_order[player][pit]
+    size = variant.zobrist_size
+    if count < variant.cycle_len:
+        inc = variant.zobrist_inc
+        for pos in order[:count]:
+            n = houses[pos]
+            if not n:
+                mask |= 1 << pos
+            elif n >= size:
+                size = variant.grow_zobrist(n + 1)
+            key ^= inc[pos][n]
+            houses[pos] = n + 1
+            stones[owner[pos]] += 1
+        last = order[count - 1]
+    else:
+        # Every slot of the cycle gets the full laps; the first ``rest`` one more
+        laps, rest = divmod(count, variant.cycle_len)
+        for j, pos in enumerate(order):
+            add = laps + 1 if j < rest else laps
+            n = houses[pos]
+            if not n:
+                mask |= 1 << pos
+            if n + add >= size:
+                size = variant.grow_zobrist(n + add + 1)
+            key ^= keys[pos][n] ^ keys[pos][n + add]
+            houses[pos] = n + add
+            stones[owner[pos]] += add
+        last = order[rest - 1]  # the pit itself when rest == 0
+    state.mask = mask
+
+    # Extra turn when the last stone lands in the player's own ulo
+    if last != variant.ulo[player]:
+        state.player = 3 - player
+        state.round += 1
+        key ^= variant.zobrist_p2
+    state.key = key
+    return (pit, count, player)
+
+
+def unmake_move(state, undo):
+    """Take back the move that returned ``undo`` from make_move."""
+    pit, count, player = undo
+    variant = state.variant
+    houses = state.houses
+    stones = state.stones
+    owner = variant.owner
+    mask = state.mask
+    keys = variant.zobrist
+    key = state.key
+
+    order = variant.sow_order[player][pit]
+    if count < variant.cycle_len:
+        inc = variant.zobrist_inc
+        for pos in order[:count]:
+            n = houses[pos] - 1
+            houses[pos] = n
+            key ^= inc[pos][n]
+            stones[owner[pos]] -= 1
+            if not n:
+                mask &= ~(1 << pos)
+    else:
+        laps, rest = divmod(count, variant.cycle_len)
+        for j, pos in enumerate(order):
+            add = laps + 1 if j < rest else laps
+            n = houses[pos] - add
+            houses[pos] = n
+            key ^= keys[pos][n + add] ^ keys[pos][n]
+            stones[owner[pos]] -= add
+            if not n:
+                mask &= ~(1 << pos)
+    houses[pit] = count
+    stones[owner[pit]] += count
+    state.mask = mask | 1 << pit
+    key ^= keys[pit][0] ^ keys[pit][count]
+
+    if state.player != player:
+        state.player = player
+        state.round -= 1
+        key ^= variant.zobrist_p2
+    state.key = key
+
+
+def apply_move(state, pit):
+    """Return the position after the player to move sows ``pit``."""
+    if pit not in state.variant.houses[state.player] or state.houses[pit] == 0:
+        raise ValueError(f"Illegal move {pit} for player {state.player}")
+    new_state = state.copy()
+    make_move(new_state, pit)
+    return new_state
@@ -0,0 +1,271 @@
+"""Persistent leaderboard: match results and per-player totals in SQLite.
+
+The database runs in WAL mode so page views keep reading while results are
+written.  Connections are pooled: a thread borrows one for each operation
+and gives it back, so Streamlit's short-lived script threads do not open a
+connection per rerun.  Results are queued and inserted in batches, one
+transaction per batch, and the same transaction adds the batch to the
+``players`` totals.  Top-N and rank queries read those totals through an
+index and never scan the match history.  Each flush also updates the
+Glicko ratings of the players in the batch, game by game (sungka_ratings).
+
+Ranking: most wins first, then most points (stones banked in ulos).
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from sungka_ratings import PERIOD_SECONDS, match_score, period_of, rate_game, recompute
+
+DEFAULT_LEADERBOARD_PATH = "leaderboard.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id       INTEGER PRIMARY KEY,
+    finished REAL NOT NULL,
+    player1  TEXT NOT NULL,
+    player2  TEXT NOT NULL,
+    score1   INTEGER NOT NULL,
+    score2   INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS players (
+    name   TEXT PRIMARY KEY,
+    games  INTEGER NOT NULL,
+    wins   INTEGER NOT NULL,
+    draws  INTEGER NOT NULL,
+    losses INTEGER NOT NULL,
+    points INTEGER NOT NULL,
+    best   INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS players_by_rank ON players (wins DESC, points DESC, name);
+CREATE TABLE IF NOT EXISTS ratings (
+    name   TEXT PRIMARY KEY,
+    rating REAL NOT NULL,
+    rd     REAL NOT NULL,
+    period INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ratings_by_rating ON ratings (rating DESC);
+"""
+
+PLAYER_COLUMNS = ("name", "games", "wins", "draws", "losses", "points", "best")
+
+UPSERT_PLAYER = """
+INSERT INTO players (name, games, wins, draws, losses, points, best) VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (name) DO UPDATE SET
+    games = games + excluded.games,
+    wins = wins + excluded.wins,
+    draws = draws + excluded.draws,
+    losses = losses + excluded.losses,
+    points = points + excluded.points,
+    best = MAX(best, excluded.best)
+"""
+
+
+def _player_totals(matches):
+    # Per-player deltas of a batch: [games, wins, draws, losses, points, best]
+    totals = {}
+    for _finished, player1, player2, score1, score2 in matches:
+        for name, own, other in ((player1, score1, score2), (player2, score2, score1)):
+            row = totals.setdefault(name, [0, 0, 0, 0, 0, 0])
+            row[0] += 1
+            row[1 if own > other else 2 if own == other else 3] += 1
+            row[4] += own
+            row[5] = max(row[5], own)
+    return [(name, *row) for name, row in totals.items()]
+
+
+class Leaderboard:
+    """Thread-safe leaderboard store shared by every session of the app.
+
+    ``record`` only queues a result; queued results are written once
+    ``batch_size`` are waiting, after ``flush_interval`` seconds, or before
+    any query, so readers always see every recorded game.
+    """
+
+    def __init__(self, path=DEFAULT_LEADERBOARD_PATH, batch_size=64, flush_interval=1.0, max_idle=8,
+                 period_seconds=PERIOD_SECONDS):
+        self.path = path
+        self.period_seconds = period_seconds
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._idle = queue.LifoQueue(maxsize=max_idle)
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+        self._flusher = threading.Thread(target=self._flush_loop, name="leaderboard-flush", daemon=True)
+        self._flusher.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # WAL stays consistent; only the last commits can be lost on power failure
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        # Borrow an idle connection (or open one) and return it to the pool afterwards
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def record(self, player1, player2, score1, score2, finished=None):
+        """Queue the result of a finished game (scores are the final ulo counts)."""
+        match = (time.time() if finished is None else finished, player1, player2, score1, score2)
+        with self._pending_lock:
+            self._pending.append(match)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self.flush()
+        else:
+            self._wake.set()
+
+    def flush(self):
+        """Write every queued result in one transaction."""
+        with self._write_lock:
+            with self._pending_lock:
+                matches, self._pending = self._pending, []
+            if not matches:
+                return 0
+            with self._connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.executemany("INSERT INTO matches (finished, player1, player2, score1, score2) "
+                                     "VALUES (?, ?, ?, ?, ?)", matches)
+                    conn.executemany(UPSERT_PLAYER, _player_totals(matches))
+                    self._rate(conn, matches)
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    with self._pending_lock:
+                        self._pending[:0] = matches  # keep them for the next flush
+                    raise
+            return len(matches)
+
+    def _rate(self, conn, matches):
+        # Rate the batch game by game, starting from the stored ratings of its players
+        names = list({name for match in matches for name in match[1:3]})
+        current = {}
+        for chunk in range(0, len(names), 500):
+            part = names[chunk:chunk + 500]
+            current.update((row[0], row[1:]) for row in conn.execute(
+                f"SELECT name, rating, rd, period FROM ratings WHERE name IN ({', '.join('?' * len(part))})", part))
+        for finished, player1, player2, score1, score2 in matches:
+            current[player1], current[player2] = rate_game(current.get(player1), current.get(player2),
+                                                           match_score(score1, score2),
+                                                           period_of(finished, self.period_seconds))
+        conn.executemany("INSERT OR REPLACE INTO ratings (name, rating, rd, period) VALUES (?, ?, ?, ?)",
+                         [(name, *current[name]) for name in names])
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wake.wait()
+            self._wake.clear()
+            if self._closed:
+                break  # close() flushes what is left
+            time.sleep(self.flush_interval)  # let a batch gather
+            try:
+                self.flush()
+            except sqlite3.Error:
+                pass  # retried on the next record or query
+
+    def top(self, n=10):
+        """The ``n`` best players as dicts, best first."""
+        self.flush()
+        with self._connection() as conn:
+            rows = conn.execute(f"SELECT {', '.join(PLAYER_COLUMNS)} FROM players "
+                                "ORDER BY wins DESC, points DESC, name LIMIT ?", (n,)).fetchall()
+        return [dict(zip(PLAYER_COLUMNS, row)) for row in rows]
+
+    def player(self, name):
+        """Totals of one player as a dict with their rank, or None for an unknown name."""
+        self.flush()
+        with self._connection() as conn:
+            row = conn.execute(f"SELECT {', '.join(PLAYER_COLUMNS)} FROM players WHERE name = ?",
+                               (name,)).fetchone()
+            if row is None:
+                return None
+            entry = dict(zip(PLAYER_COLUMNS, row))
+            rating = conn.execute("SELECT rating, rd FROM ratings WHERE name = ?", (name,)).fetchone()
+            entry["rating"], entry["rd"] = rating if rating is not None else (None, None)
+            # Players ranked above: more wins, or as many wins and more points (an index range)
+            ahead = conn.execute("SELECT COUNT(*) FROM players WHERE wins > ? "
+                                 "UNION ALL SELECT COUNT(*) FROM players WHERE wins = ? AND points > ?",
+                                 (entry["wins"], entry["wins"], entry["points"])).fetchall()
+        entry["rank"] = 1 + sum(count for count, in ahead)
+        return entry
+
+    def top_rated(self, n=10):
+        """The ``n`` highest rated players as dicts with name, rating and rd."""
+        self.flush()
+        with self._connection() as conn:
+            rows = conn.execute("SELECT name, rating, rd FROM ratings ORDER BY rating DESC LIMIT ?",
+                                (n,)).fetchall()
+        return [{"name": name, "rating": rating, "rd": rd} for name, rating, rd in rows]
+
+    def recompute_ratings(self, period_seconds=None, chunk_rows=100_000):
+        """Replace every rating by a bulk replay of the match history; returns the games rated."""
+        import numpy as np  # only the bulk recompute needs NumPy
+
+        period_seconds = period_seconds or self.period_seconds
+        self.flush()
+        # Holding the write lock queues live results until the new ratings are in
+        with self._write_lock, self._connection() as conn:
+            cursor = conn.execute(
+                "SELECT m.finished, p1.rowid, p2.rowid, m.score1, m.score2 FROM matches m "
+                "JOIN players p1 ON p1.name = m.player1 JOIN players p2 ON p2.name = m.player2 ORDER BY m.id")
+            chunks = []
+            while True:
+                rows = cursor.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                chunks.append(np.array(rows, dtype=np.float64))
+            history = np.concatenate(chunks) if chunks else np.empty((0, 5))
+            history = history[np.argsort(history[:, 0], kind="stable")]  # time order
+            rowids, players = np.unique(history[:, 1:3].astype(np.int64), return_inverse=True)
+            players = players.reshape(-1, 2)
+            score1 = (np.sign(history[:, 3] - history[:, 4]) + 1) / 2
+            periods = (history[:, 0] // period_seconds).astype(np.int64)
+            rating, rd, last = recompute(players[:, 0], players[:, 1], score1, periods, len(rowids))
+
+            names = dict(conn.execute("SELECT rowid, name FROM players"))
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM ratings")
+                conn.executemany("INSERT INTO ratings (name, rating, rd, period) VALUES (?, ?, ?, ?)",
+                                 zip((names[rowid] for rowid in rowids.tolist()),
+                                     rating.tolist(), rd.tolist(), last.tolist()))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return len(history)
+
+    def rank(self, name):
+        """1-based rank of ``name`` (ties on wins and points share a rank), or None."""
+        entry = self.player(name)
+        return None if entry is None else entry["rank"]
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        self.flush()
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
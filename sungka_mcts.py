@@ -0,0 +1,197 @@
+"""Monte Carlo Tree Search (UCT) bot with root parallelism.
+
+Each worker process grows its own UCT tree from the same root with a
+different seed until its deadline, then sends back the visit and win
+counts of the root moves.  MCTSBot adds those counts up and plays the most
+visited move.  Results that miss the deadline are dropped, so per-move
+latency stays at ``time_budget`` however many workers are used.
+
+Handing a search to a worker and getting its counts back costs a few
+milliseconds, and a worker process that is still starting costs far more,
+so budgets too short to pay for that round trip, and moves asked for
+before the pool is up, are searched in the calling process instead.
+"""
+
+import math
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import sungka_engine as engine
+from sungka_bot import ordered_moves
+
+EXPLORATION = 1.4
+POOL_ROUND_TRIP = 0.005   # seconds to hand a search to a warm worker and get its counts back
+INLINE_BELOW = 4 * POOL_ROUND_TRIP  # budgets under this are searched in the calling process
+
+_executor = None
+_warmup = []
+_executor_lock = threading.Lock()
+
+
+class Node:
+    __slots__ = ('player', 'children', 'untried', 'visits', 'wins')
+
+    def __init__(self, state, player):
+        self.player = player  # the player who made the move into this node
+        self.children = {}
+        self.untried = engine.legal_moves(state)
+        self.visits = 0
+        self.wins = 0.0
+
+    def select(self, exploration):
+        log_visits = math.log(self.visits)
+        best_move, best_score = None, -1.0
+        for move, child in self.children.items():
+            score = child.wins / child.visits + exploration * math.sqrt(log_visits / child.visits)
+            if score > best_score:
+                best_move, best_score = move, score
+        return best_move
+
+
+def _reward(state, player):
+    # 1 for a win by ``player``, 0.5 for a tie, 0 for a loss
+    result = engine.winner(state)
+    if result == 0:
+        return 0.5
+    return 1.0 if result == player else 0.0
+
+
+def uct_search(code, round, max_rounds=None, time_budget=0.1, seed=None, exploration=EXPLORATION,
+               variant=engine.STANDARD):
+    """Run UCT from a packed position and return {move: (visits, wins)} for the root."""
+    deadline = time.perf_counter() + time_budget
+    rng = random.Random(seed)
+    state = engine.State.from_packed(code, round, variant)
+    root = Node(state, 3 - state.player)
+    make_move, unmake_move = engine.make_move, engine.unmake_move
+
+    while time.perf_counter() < deadline:
+        node = root
+        path = [root]
+        undo = []
+
+        # Selection
+        while not node.untried and node.children:
+            move = node.select(exploration)
+            undo.append(make_move(state, move))
+            node = node.children[move]
+            path.append(node)
+
+        # Expansion
+        if node.untried and not engine.is_terminal(state, max_rounds):
+            move = node.untried.pop(rng.randrange(len(node.untried)))
+            player = state.player
+            undo.append(make_move(state, move))
+            child = Node(state, player)
+            node.children[move] = child
+            node = child
+            path.append(node)
+
+        # Random playout
+        while not engine.is_terminal(state, max_rounds):
+            undo.append(make_move(state, rng.choice(engine.legal_moves(state))))
+
+        # Backpropagation
+        for node in path:
+            node.visits += 1
+            node.wins += _reward(state, node.player)
+        while undo:
+            unmake_move(state, undo.pop())
+
+    return {move: (child.visits, child.wins) for move, child in root.children.items()}
+
+
+def _noop():
+    return os.getpid()
+
+
+def get_executor(workers=None):
+    """Process pool shared by every MCTSBot in this process, created on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = workers or os.cpu_count() or 1
+            # spawn, not fork: the Streamlit server process is multi-threaded
+            context = multiprocessing.get_context("spawn")
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+            # Start the worker processes now rather than on the first move.  Streamlit
+            # installs the page script as __main__, and spawn would run it again in
+            # every worker, so the workers are started with an empty __main__.
+            main = sys.modules["__main__"]
+            sys.modules["__main__"] = types.ModuleType("__main__")
+            try:
+                _warmup[:] = [_executor.submit(_noop) for _ in range(workers)]
+            finally:
+                sys.modules["__main__"] = main
+        return _executor
+
+
+def pool_ready():
+    """True once every worker process of the shared pool has started."""
+    with _executor_lock:
+        return _executor is not None and all(future.done() for future in _warmup)
+
+
+class MCTSBot:
+    """UCT bot that spreads root-parallel searches over a process pool.
+
+    ``margin`` is the share of ``time_budget`` kept back for merging; every
+    worker searches for the rest minus the pool's round trip, and the bot
+    waits at most ``time_budget`` seconds and merges whatever finished.
+    With ``inline`` the search always runs in the calling process, for
+    callers that are pool workers themselves.
+    """
+
+    def __init__(self, time_budget=0.2, workers=None, max_rounds=None,
+                 exploration=EXPLORATION, margin=0.1, inline=False):
+        self.time_budget = time_budget
+        self.workers = workers or os.cpu_count() or 1
+        self.max_rounds = max_rounds
+        self.exploration = exploration
+        self.margin = margin
+        self.inline = inline
+        self.playouts = 0
+
+    def choose_move(self, state):
+        moves = engine.legal_moves(state)
+        if len(moves) == 1:
+            return moves[0]
+
+        search_time = self.time_budget * (1 - self.margin)
+        code = state.packed()
+        if not self.inline and self.time_budget >= INLINE_BELOW:
+            executor = get_executor(self.workers)
+            if pool_ready():
+                return self._pool_search(executor, state, moves, code, search_time - POOL_ROUND_TRIP)
+
+        stats = uct_search(code, state.round, self.max_rounds, search_time,
+                           random.getrandbits(32), self.exploration, state.variant)
+        self.playouts = sum(count for count, _wins in stats.values())
+        if not self.playouts:
+            return ordered_moves(state)[0]
+        return max(stats, key=lambda move: stats[move][0])
+
+    def _pool_search(self, executor, state, moves, code, search_time):
+        futures = [executor.submit(uct_search, code, state.round, self.max_rounds,
+                                   search_time, random.getrandbits(32), self.exploration, state.variant)
+                   for _ in range(self.workers)]
+        done, not_done = wait(futures, timeout=self.time_budget)
+        for future in not_done:
+            future.cancel()
+
+        # Merge root statistics from every finished worker
+        visits = dict.fromkeys(moves, 0)
+        for future in done:
+            if future.exception() is None:
+                for move, (count, _wins) in future.result().items():
+                    visits[move] += count
+        self.playouts = sum(visits.values())
+        if not self.playouts:
+            return ordered_moves(state)[0]
+        return max(visits, key=visits.get)
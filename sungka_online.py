@@ -0,0 +1,172 @@
+"""Live games shared between sessions, for remote two-player play.
+
+A GameStore (one per process, held with st.cache_resource) maps game ids
+to LiveGame objects.  Every LiveGame has its own lock; a session takes a
+seat with join() and gets a token that authorizes its moves.  Each change
+bumps the game's ``version`` and wakes every waiter on the game's
+condition, so the waiting player's page blocks in wait_for_change()
+and redraws its board in place, without rerunning the page.
+
+Any number of spectator sessions can watch a game the same way, read-only:
+a spectator's page stays in that wait for the whole game and only draws
+when the version changes.  A game builds one snapshot per version and
+hands that same object to every viewer, so a crowd woken by a move shares
+it instead of copying the game state once per session.
+"""
+
+import random
+import secrets
+import threading
+import time
+from types import MappingProxyType
+
+import sungka_engine as engine
+
+FINISHED_TTL = 600    # seconds a finished game stays listed
+IDLE_TTL = 3600       # seconds without a move before a game is dropped
+
+
+class LiveGame:
+    """A game played by two sessions; every method is thread-safe."""
+
+    def __init__(self, game_id, host, max_rounds=None, variant=engine.STANDARD, on_finish=None):
+        self.id = game_id
+        self.max_rounds = max_rounds
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._on_finish = on_finish
+        self.first_player = random.choice((1, 2))
+        self.state = engine.new_game(self.first_player, variant)
+        self.seats = {1: host, 2: None}
+        self._tokens = {1: secrets.token_hex(8), 2: None}
+        self.history = []
+        self.version = 0
+        self.finished = False
+        self.abandoned_by = None
+        self.updated = time.time()
+        self._snapshot = None
+
+    @property
+    def host_token(self):
+        return self._tokens[1]
+
+    def _changed_now(self):
+        # Caller holds the lock
+        self.version += 1
+        self.updated = time.time()
+        self._snapshot = None
+        self._changed.notify_all()
+
+    def join(self, name):
+        """Take the free seat; returns (seat, token).  Raises ValueError if the game is full."""
+        with self._lock:
+            if self.seats[2] is not None or self.finished:
+                raise ValueError(f"Game {self.id} is not open")
+            self.seats[2] = name
+            self._tokens[2] = secrets.token_hex(8)
+            self._changed_now()
+            return 2, self._tokens[2]
+
+    def seat_of(self, token):
+        if token is None:
+            return None  # spectators have no seat
+        for seat, seat_token in self._tokens.items():
+            if seat_token is not None and secrets.compare_digest(seat_token, token):
+                return seat
+        return None
+
+    def move(self, token, pit):
+        """Play ``pit`` for the seat holding ``token``.  Raises ValueError for an illegal move."""
+        with self._lock:
+            seat = self.seat_of(token)
+            if seat is None or self.finished or self.seats[2] is None:
+                raise ValueError("This game is not waiting for your move")
+            if seat != self.state.player or pit not in engine.legal_moves(self.state):
+                raise ValueError(f"Illegal move {pit} for player {seat}")
+            engine.make_move(self.state, pit)
+            self.history.append(pit)
+            self.finished = engine.is_terminal(self.state, self.max_rounds)
+            self._changed_now()
+            result = self._result() if self.finished else None
+        if result is not None and self._on_finish is not None:
+            self._on_finish(result)
+
+    def leave(self, token):
+        """Abandon the game; the opponent is told and nothing is recorded."""
+        with self._lock:
+            seat = self.seat_of(token)
+            if seat is None or self.finished:
+                return
+            self.abandoned_by = seat
+            self.finished = True
+            self._changed_now()
+
+    def _result(self):
+        return {"players": [self.seats[1], self.seats[2]], "moves": list(self.history),
+                "first_player": self.first_player, "houses": self.state.to_list()}
+
+    def snapshot(self):
+        """Everything a page needs to draw the game, as a read-only mapping.
+
+        Built once per version and shared by every caller, so it must not be
+        modified (``houses`` is a tuple for that reason).
+        """
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = MappingProxyType({
+                    "id": self.id, "version": self.version, "houses": tuple(self.state.houses),
+                    "player": self.state.player, "round": self.state.round,
+                    "seats": MappingProxyType(dict(self.seats)), "finished": self.finished,
+                    "abandoned_by": self.abandoned_by, "moves": len(self.history)})
+            return self._snapshot
+
+    def wait_for_change(self, version, timeout):
+        """Block until the game moves past ``version``; False on timeout."""
+        with self._changed:
+            return self._changed.wait_for(lambda: self.version != version, timeout)
+
+
+class GameStore:
+    """Process-wide registry of live games, keyed by a short id."""
+
+    def __init__(self, max_rounds=None, on_finish=None):
+        self.max_rounds = max_rounds
+        self.on_finish = on_finish
+        self._games = {}
+        self._lock = threading.Lock()
+
+    def create(self, host):
+        """Open a new game with ``host`` in seat 1; returns (game, token)."""
+        with self._lock:
+            self._expire()
+            game_id = secrets.token_hex(3)
+            while game_id in self._games:
+                game_id = secrets.token_hex(3)
+            game = self._games[game_id] = LiveGame(game_id, host, self.max_rounds, on_finish=self.on_finish)
+        return game, game.host_token
+
+    def get(self, game_id):
+        with self._lock:
+            return self._games.get(game_id)
+
+    def open_games(self):
+        """Games waiting for a second player, oldest first."""
+        with self._lock:
+            games = list(self._games.values())
+        return [game for game in games if game.seats[2] is None and not game.finished]
+
+    def live_games(self):
+        """Games in progress that spectators can watch, oldest first."""
+        with self._lock:
+            games = list(self._games.values())
+        return [game for game in games if game.seats[2] is not None and not game.finished]
+
+    def _expire(self):
+        # Caller holds the lock
+        now = time.time()
+        for game_id, game in list(self._games.items()):
+            if now - game.updated > (FINISHED_TTL if game.finished else IDLE_TTL):
+                del self._games[game_id]
+
+    def __len__(self):
+        return len(self._games)
@@ -0,0 +1,153 @@
+"""Perft: count the positions reachable from the start to a given depth.
+
+    python sungka_perft.py --depth 8 [--workers N] [--divide] [--check]
+
+A ply is one player's whole turn: when the last stone lands in the
+mover's own ulo the same player moves again within the same ply, so a
+chain of extra turns counts once.  A game that ends before ``depth`` plies
+counts as one leaf.
+
+The counts pin down the sowing rules (``--check`` compares them with
+REFERENCE_COUNTS), and the leaves per second over a fixed depth are the
+throughput benchmark for changes to make_move/unmake_move.  Root subtrees
+are split into at least ``4 * workers`` jobs and counted in a process pool.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import sungka_engine as engine
+
+# Leaf counts from the standard start, Player 1 moving first, no round limit
+REFERENCE_COUNTS = {
+    1: 5,
+    2: 25,
+    3: 131,
+    4: 669,
+    5: 4342,
+    6: 37202,
+    7: 392004,
+    8: 4613490,
+}
+
+
+def perft(state, depth, max_rounds=None):
+    """Leaves of the move tree below ``state``, ``depth`` plies deep."""
+    if depth == 0 or engine.is_terminal(state, max_rounds):
+        return 1
+    make_move, unmake_move = engine.make_move, engine.unmake_move
+    player = state.player
+    nodes = 0
+    for pit in engine.legal_moves(state):
+        undo = make_move(state, pit)
+        # An extra turn continues the same ply
+        nodes += perft(state, depth if state.player == player else depth - 1, max_rounds)
+        unmake_move(state, undo)
+    return nodes
+
+
+def _children(state, depth, max_rounds):
+    # (move, child position, plies left) for every move of the player to move
+    player = state.player
+    for pit in engine.legal_moves(state):
+        child = engine.apply_move(state, pit)
+        yield pit, child, depth if child.player == player else depth - 1
+
+
+def split(state, depth, min_jobs, max_rounds=None):
+    """Split the tree below ``state`` into independent subtrees.
+
+    Returns (jobs, counted): ``jobs`` is a list of (root move, position,
+    plies left) with at least ``min_jobs`` entries when the tree allows it,
+    ``counted`` maps root moves to leaves already reached while splitting.
+    """
+    counted = {}
+    jobs = [(pit, child, left) for pit, child, left in _children(state, depth, max_rounds)]
+    while 0 < len(jobs) < min_jobs:
+        expanded = []
+        for root, position, left in jobs:
+            if left == 0 or engine.is_terminal(position, max_rounds):
+                counted[root] = counted.get(root, 0) + 1
+                continue
+            expanded.extend((root, child, child_left)
+                            for _pit, child, child_left in _children(position, left, max_rounds))
+        jobs = expanded
+    return jobs, counted
+
+
+def _perft_job(args):
+    root, code, round, variant, depth, max_rounds = args
+    return root, perft(engine.State.from_packed(code, round, variant), depth, max_rounds)
+
+
+def divide(state, depth, max_rounds=None, workers=None, executor=None):
+    """Leaf counts per root move, with subtrees counted in a process pool.
+
+    Pass ``executor`` to reuse a pool across calls; otherwise one with
+    ``workers`` processes is created for this call.
+    """
+    if depth == 0 or engine.is_terminal(state, max_rounds):
+        return {}
+    workers = workers or os.cpu_count() or 1
+    jobs, counts = split(state, depth, 4 * workers, max_rounds)
+    args = [(root, position.packed(), position.round, position.variant, left, max_rounds)
+            for root, position, left in jobs]
+    for pit in engine.legal_moves(state):
+        counts.setdefault(pit, 0)
+    if executor is None:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_perft_job, args))
+    else:
+        results = executor.map(_perft_job, args)
+    for root, nodes in results:
+        counts[root] += nodes
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Count Sungka positions to a given depth (perft).")
+    parser.add_argument("--depth", type=int, default=6, help="plies to search (an extra-turn chain is one ply)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--max-rounds", type=int, default=None, help="round limit of the rules (app: 5)")
+    parser.add_argument("--first-player", type=int, choices=(1, 2), default=1)
+    parser.add_argument("--pits", type=int, default=5, help="houses per side")
+    parser.add_argument("--stones", type=int, default=7, help="starting stones per house")
+    parser.add_argument("--skipped-ulo", choices=engine.SKIPPED_ULO_RULES, default="opponent")
+    parser.add_argument("--divide", action="store_true", help="print the count below every root move")
+    parser.add_argument("--check", action="store_true", help="compare depths 1..DEPTH with REFERENCE_COUNTS")
+    args = parser.parse_args(argv)
+
+    variant = engine.get_variant(args.pits, args.stones, args.skipped_ulo)
+    state = engine.new_game(args.first_player, variant)
+    standard_rules = (variant is engine.STANDARD and args.first_player == 1 and args.max_rounds is None)
+    if args.check and not standard_rules:
+        parser.error("--check needs the standard board, Player 1 first and no round limit")
+
+    workers = args.workers or os.cpu_count() or 1
+    depths = range(1, args.depth + 1) if args.check else [args.depth]
+    failed = False
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Start the workers before timing anything
+        list(executor.map(abs, range(workers)))
+        for depth in depths:
+            start = time.perf_counter()
+            counts = divide(state, depth, args.max_rounds, workers, executor)
+            elapsed = time.perf_counter() - start
+            nodes = sum(counts.values()) if counts else 1
+            if args.divide:
+                for pit, count in sorted(counts.items()):
+                    print(f"  {pit:>3}: {count}")
+            line = f"perft({depth}) = {nodes} in {elapsed:.2f}s ({nodes / elapsed:,.0f} nodes/s)"
+            if args.check and depth in REFERENCE_COUNTS:
+                ok = nodes == REFERENCE_COUNTS[depth]
+                failed |= not ok
+                line += "  ok" if ok else f"  MISMATCH (expected {REFERENCE_COUNTS[depth]})"
+            print(line)
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Pondering: the bot searches its replies while the human is thinking.
+
+When it is the human's turn, Ponderer.start() queues a background search,
+on a thread pool shared by every session, of each position the human can
+leave the bot in with one move (likeliest moves first), followed through
+the bot's own extra-turn chain.  Results are stored by position.  Once the
+human has moved, take() returns the stored reply, or waits for the search
+already running on that position; only a move the ponderer did not reach
+is searched from scratch.  Pondered searches use the bot's full budget and
+depth, so a pondered reply is as strong as a fresh one.
+
+Searches stop cooperatively: starting on a new position sets the stop event
+of the previous one, which the search checks every few hundred nodes, and a
+Ponderer that is garbage collected with its session does the same.
+"""
+
+import threading
+import weakref
+
+import sungka_engine as engine
+from sungka_bot import ordered_moves
+
+
+def position_key(state):
+    return state.packed(), state.round
+
+
+class _Pondering:
+    # Stop flag and results of one pondered position, shared with the worker thread
+    def __init__(self, key):
+        self.key = key
+        self.stop = threading.Event()
+        self.results = {}
+        self.searching = None  # key of the position being searched right now
+        self.changed = threading.Condition()
+
+
+def _ponder(pondering, state, make_bot, max_rounds):
+    player = state.player
+    for pit in ordered_moves(state):
+        child = state.copy()
+        engine.make_move(child, pit)
+        # Follow the bot's extra turns; a move that keeps the turn leaves nothing to ponder
+        while child.player != player and not engine.is_terminal(child, max_rounds):
+            key = position_key(child)
+            with pondering.changed:
+                if pondering.stop.is_set():
+                    return
+                if key in pondering.results:
+                    break  # reached through another move already
+                pondering.searching = key
+            bot = make_bot(pondering.stop)
+            move = None
+            try:
+                move = bot.choose_move(child)
+            finally:
+                stopped = move is None or getattr(bot, "stopped", False)
+                with pondering.changed:
+                    pondering.searching = None
+                    if not stopped:
+                        pondering.results[key] = move
+                    pondering.changed.notify_all()
+            if stopped:
+                return  # a search cut short is not full strength; drop it
+            engine.make_move(child, move)
+
+
+class Ponderer:
+    """Background searches of the bot's replies for one session."""
+
+    def __init__(self, executor, max_rounds=None):
+        self.executor = executor
+        self.max_rounds = max_rounds
+        self._pondering = None
+        self._finalizer = None
+
+    def start(self, state, make_bot):
+        """Ponder the replies to every move of the player to move in ``state``.
+
+        ``make_bot(stop)`` must return a fresh bot that searches until
+        ``stop`` is set.  Does nothing if ``state`` is already being
+        pondered; after cancel() it starts afresh, with the new bot.
+        """
+        key = position_key(state)
+        pondering = self._pondering
+        if pondering is not None and pondering.key == key and not pondering.stop.is_set():
+            return
+        self.cancel()
+        pondering = self._pondering = _Pondering(key)
+        self._finalizer = weakref.finalize(self, pondering.stop.set)
+        self.executor.submit(_ponder, pondering, state.copy(), make_bot, self.max_rounds)
+
+    def take(self, state):
+        """The pondered move for ``state``, waiting for it if it is being searched; else None."""
+        pondering = self._pondering
+        if pondering is None:
+            return None
+        key = position_key(state)
+        with pondering.changed:
+            while pondering.searching == key:
+                pondering.changed.wait()
+            return pondering.results.get(key)
+
+    def cancel(self):
+        """Stop pondering and forget its results (a new game may start from the same position)."""
+        if self._pondering is not None:
+            self._pondering.stop.set()
+            self._pondering = None
+        if self._finalizer is not None:
+            self._finalizer.detach()
+            self._finalizer = None
@@ -0,0 +1,142 @@
+"""Glicko-1 ratings (on the Elo scale) for players and bots.
+
+Live updates rate each finished game on its own: rate_game is O(1) and
+only needs the two players' (rating, RD, last period).  A player's RD
+grows back towards INITIAL_RD for every rating period (a day by default)
+they sit out.
+
+recompute replays a whole match history in time order as Glicko rating
+periods: every game of a period is scored against the ratings at the start
+of the period, and the period is one vectorized NumPy step over all its
+games.  Millions of results take seconds, which is what a recalculation
+after a rule change or bot retune needs.  Because the live path rates game
+by game, its numbers differ slightly from a recompute of the same history.
+
+    python sungka_ratings.py --db leaderboard.db --period-hours 24
+"""
+
+import argparse
+import math
+import time
+
+INITIAL_RATING = 1500.0
+INITIAL_RD = 350.0
+MIN_RD = 30.0
+RD_GROWTH = 34.6  # c: an idle player's RD climbs from 50 back to 350 in about 100 periods
+PERIOD_SECONDS = 86400
+
+Q = math.log(10) / 400
+
+
+def period_of(timestamp, period_seconds=PERIOD_SECONDS):
+    return int(timestamp // period_seconds)
+
+
+def current_rd(rd, last_period, period):
+    """RD after sitting out the periods since ``last_period`` (None: never rated)."""
+    if last_period is None:
+        return rd
+    return min(math.sqrt(rd * rd + RD_GROWTH * RD_GROWTH * max(period - last_period, 0)), INITIAL_RD)
+
+
+def _g(rd):
+    return 1 / math.sqrt(1 + 3 * Q * Q * rd * rd / (math.pi * math.pi))
+
+
+def glicko_update(rating, rd, opp_rating, opp_rd, score):
+    """(rating, RD) after one game; ``score`` is 1 for a win, 0.5 for a draw, 0 for a loss."""
+    g = _g(opp_rd)
+    expected = 1 / (1 + 10 ** (-g * (rating - opp_rating) / 400))
+    denominator = 1 / (rd * rd) + Q * Q * g * g * expected * (1 - expected)
+    return rating + Q / denominator * g * (score - expected), max(math.sqrt(1 / denominator), MIN_RD)
+
+
+def rate_game(player1, player2, score1, period):
+    """New (rating, RD, period) of both players after one game.
+
+    ``player1``/``player2`` are (rating, RD, last period) tuples, or None
+    for a new player; ``score1`` is Player 1's result (1, 0.5 or 0).
+    """
+    rating1, rd1, last1 = player1 or (INITIAL_RATING, INITIAL_RD, None)
+    rating2, rd2, last2 = player2 or (INITIAL_RATING, INITIAL_RD, None)
+    rd1 = current_rd(rd1, last1, period)
+    rd2 = current_rd(rd2, last2, period)
+    new1 = glicko_update(rating1, rd1, rating2, rd2, score1)
+    new2 = glicko_update(rating2, rd2, rating1, rd1, 1 - score1)
+    return (*new1, period), (*new2, period)
+
+
+def match_score(score1, score2):
+    """Player 1's result from the final ulo counts."""
+    return 1.0 if score1 > score2 else 0.0 if score1 < score2 else 0.5
+
+
+def recompute(player1, player2, score1, periods, num_players):
+    """Ratings of every player after replaying a whole history.
+
+    ``player1``/``player2`` are integer player ids (0..num_players-1),
+    ``score1`` Player 1's results and ``periods`` the rating period of each
+    game, all NumPy arrays in time order.  Returns (rating, rd, last
+    period) arrays indexed by player id; last period is -1 for players
+    without games.
+    """
+    import numpy as np  # only the bulk recompute needs NumPy
+
+    player1 = np.asarray(player1, dtype=np.int64)
+    player2 = np.asarray(player2, dtype=np.int64)
+    score1 = np.asarray(score1, dtype=np.float64)
+    periods = np.asarray(periods, dtype=np.int64)
+
+    rating = np.full(num_players, INITIAL_RATING)
+    rd = np.full(num_players, INITIAL_RD)
+    last = np.full(num_players, -1, dtype=np.int64)
+
+    starts = np.flatnonzero(np.diff(periods)) + 1
+    bounds = zip(np.concatenate(([0], starts)), np.concatenate((starts, [len(periods)])))
+    for start, end in bounds:
+        if start == end:
+            continue
+        period = periods[start]
+        count = end - start
+        # Each game appears twice, once from each side
+        players = np.concatenate((player1[start:end], player2[start:end]))
+        scores = np.concatenate((score1[start:end], 1 - score1[start:end]))
+        ids, side = np.unique(players, return_inverse=True)
+        opponent = np.concatenate((side[count:], side[:count]))
+
+        idle = np.where(last[ids] >= 0, period - last[ids], 0)
+        rd_now = np.minimum(np.sqrt(rd[ids] ** 2 + RD_GROWTH ** 2 * idle), INITIAL_RD)
+        rating_now = rating[ids]
+
+        g = 1 / np.sqrt(1 + 3 * Q * Q * rd_now[opponent] ** 2 / np.pi ** 2)
+        expected = 1 / (1 + 10 ** (-g * (rating_now[side] - rating_now[opponent]) / 400))
+        inv_d2 = np.bincount(side, Q * Q * g * g * expected * (1 - expected), len(ids))
+        gain = np.bincount(side, g * (scores - expected), len(ids))
+
+        denominator = 1 / rd_now ** 2 + inv_d2
+        rating[ids] = rating_now + Q / denominator * gain
+        rd[ids] = np.maximum(np.sqrt(1 / denominator), MIN_RD)
+        last[ids] = period
+    return rating, rd, last
+
+
+def main(argv=None):
+    from sungka_leaderboard import DEFAULT_LEADERBOARD_PATH, Leaderboard
+
+    parser = argparse.ArgumentParser(description="Recompute every player's rating from the match history.")
+    parser.add_argument("--db", default=DEFAULT_LEADERBOARD_PATH, help="leaderboard database")
+    parser.add_argument("--period-hours", type=float, default=PERIOD_SECONDS / 3600, help="rating period length")
+    parser.add_argument("--top", type=int, default=10, help="players to print afterwards")
+    args = parser.parse_args(argv)
+
+    board = Leaderboard(args.db)
+    start = time.perf_counter()
+    games = board.recompute_ratings(args.period_hours * 3600)
+    print(f"Rated {games} games in {time.perf_counter() - start:.2f}s")
+    for i, row in enumerate(board.top_rated(args.top), 1):
+        print(f"{i:>3}. {row['name']:<24} {row['rating']:7.0f} ± {2 * row['rd']:.0f}")
+    board.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Compact binary game records, appended to segment files.
+
+A finished game is stored as a 14-byte header, the two player names and
+one byte per pit choice: about 30-40 bytes for a five-round game in the
+app.  GameRecorder appends records to
+numbered segment files in a directory and starts a new segment once the
+current one reaches ``segment_bytes``; SegmentReader memory-maps a segment
+and iterates its games without copying the move bytes.
+
+Segment layout (little-endian):
+
+    header  8 bytes    magic b"SKGR", version, 3 reserved bytes
+    record  14 bytes   size of the whole record (uint16), finish time
+                       (uint32, Unix seconds), pits per side (uint8),
+                       starting stones (uint16), flags (uint8: bit 0 set
+                       when Player 2 moved first, bit 1 set when no ulo is
+                       skipped), name lengths (2 x uint8), move count (uint16)
+            then       Player 1 and Player 2 names (UTF-8), one slot index per move
+
+A record cut short by a crash is ignored by the reader; the next segment
+opened by a writer starts clean.
+"""
+
+import mmap
+import os
+import struct
+import threading
+import time
+
+import sungka_engine as engine
+
+MAGIC = b"SKGR"
+VERSION = 1
+SEGMENT_HEADER = struct.Struct("<4sB3x")
+RECORD_HEADER = struct.Struct("<HIBHBBBH")
+
+FLAG_P2_FIRST = 1
+FLAG_NO_SKIP = 2
+
+DEFAULT_RECORD_DIR = "game_records"
+SEGMENT_SUFFIX = ".skg"
+
+
+def encode_game(players, moves, first_player=1, variant=engine.STANDARD, finished=None):
+    """Record bytes for a game: two player names and the pits chosen, in order."""
+    names = [name.encode("utf-8")[:255] for name in players]
+    flags = (FLAG_P2_FIRST if first_player == 2 else 0) | (FLAG_NO_SKIP if variant.skipped_ulo == "none" else 0)
+    size = RECORD_HEADER.size + len(names[0]) + len(names[1]) + len(moves)
+    if size > 0xFFFF or variant.pits > 0xFF or variant.stones > 0xFFFF:
+        raise ValueError("Game too large for a record")
+    finished = int(time.time() if finished is None else finished)
+    return (RECORD_HEADER.pack(size, finished, variant.pits, variant.stones, flags,
+                               len(names[0]), len(names[1]), len(moves))
+            + names[0] + names[1] + bytes(moves))
+
+
+class GameRecord:
+    """One game read from a segment.
+
+    ``moves`` is a view into the mapped file; copy it with bytes() to keep
+    it after the reader is closed.
+    """
+
+    __slots__ = ('finished', 'variant', 'first_player', 'players', 'moves')
+
+    def __init__(self, finished, variant, first_player, players, moves):
+        self.finished = finished
+        self.variant = variant
+        self.first_player = first_player
+        self.players = players
+        self.moves = moves
+
+    def replay(self):
+        """Final position of the game, replayed with the engine."""
+        state = engine.new_game(self.first_player, self.variant)
+        for pit in self.moves:
+            engine.make_move(state, pit)
+        return state
+
+    def __repr__(self):
+        return (f"GameRecord({self.players[0]!r} v {self.players[1]!r}, {len(self.moves)} moves, "
+                f"first_player={self.first_player}, variant={self.variant})")
+
+
+class SegmentReader:
+    """Memory-mapped, read-only view of one segment file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        if size < SEGMENT_HEADER.size or SEGMENT_HEADER.unpack_from(self._mmap, 0) != (MAGIC, VERSION):
+            self.close()
+            raise ValueError(f"{path} is not a Sungka game record segment")
+        self._view = memoryview(self._mmap)
+
+    def close(self):
+        if getattr(self, '_view', None) is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass  # records still hold move views; the map closes when they are freed
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self):
+        view = self._view
+        end = len(view)
+        offset = SEGMENT_HEADER.size
+        while offset + RECORD_HEADER.size <= end:
+            size, finished, pits, stones, flags, len1, len2, count = RECORD_HEADER.unpack_from(view, offset)
+            if size < RECORD_HEADER.size or offset + size > end:
+                break  # truncated record at the end of the segment
+            names = offset + RECORD_HEADER.size
+            moves = names + len1 + len2
+            variant = engine.get_variant(pits, stones, "none" if flags & FLAG_NO_SKIP else "opponent")
+            players = (bytes(view[names:names + len1]).decode("utf-8", "replace"),
+                       bytes(view[names + len1:moves]).decode("utf-8", "replace"))
+            yield GameRecord(finished, variant, 2 if flags & FLAG_P2_FIRST else 1, players,
+                             view[moves:moves + count])
+            offset += size
+
+
+def segment_paths(directory=DEFAULT_RECORD_DIR):
+    """Segment files in ``directory``, oldest first."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.endswith(SEGMENT_SUFFIX))
+
+
+def iter_games(directory=DEFAULT_RECORD_DIR):
+    """Every recorded game in ``directory``, segment by segment."""
+    for path in segment_paths(directory):
+        with SegmentReader(path) as reader:
+            yield from reader
+
+
+class GameRecorder:
+    """Thread-safe writer appending game records to segments in ``directory``."""
+
+    def __init__(self, directory=DEFAULT_RECORD_DIR, segment_bytes=64 << 20):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+        self._file = None
+        self.games = 0
+
+    def _open_segment(self):
+        os.makedirs(self.directory, exist_ok=True)
+        paths = segment_paths(self.directory)
+        number = int(os.path.basename(paths[-1])[:-len(SEGMENT_SUFFIX)]) + 1 if paths else 1
+        # Every process starts its own segment, so writers never share a file
+        while True:
+            path = os.path.join(self.directory, f"{number:08d}{SEGMENT_SUFFIX}")
+            try:
+                self._file = open(path, "xb")
+                break
+            except FileExistsError:
+                number += 1
+        self._file.write(SEGMENT_HEADER.pack(MAGIC, VERSION))
+        self._file.flush()
+
+    def append(self, players, moves, first_player=1, variant=engine.STANDARD, finished=None):
+        """Append one finished game and flush it to the segment file."""
+        record = encode_game(players, moves, first_player, variant, finished)
+        with self._lock:
+            if self._file is None or self._file.tell() + len(record) > self.segment_bytes:
+                if self._file is not None:
+                    self._file.close()
+                self._open_segment()
+            self._file.write(record)
+            self._file.flush()
+            self.games += 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
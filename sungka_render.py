@@ -0,0 +1,172 @@
+"""Board rendering for the Sungka app, with a shared cache of rendered PNGs.
+
+The board only changes when a move is made, but every Streamlit rerun used
+to rebuild and rasterize the matplotlib figure.  RenderCache keeps the PNG
+bytes of recently drawn boards, keyed by the board contents, and is meant
+to be created once per process (st.cache_resource) so all sessions share it.
+"""
+
+import io
+import threading
+from collections import OrderedDict
+
+import matplotlib.patches as patches
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import EllipseCollection
+from matplotlib.figure import Figure
+
+
+class RenderCache:
+    """Thread-safe LRU cache of rendered boards with hit/miss counters."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._rendering = {}  # key -> Event set once the rendering is stored
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, render):
+        """Return the cached rendering for ``key``, calling ``render(key)`` on a miss.
+
+        Sessions asking for a board that another session is rendering wait
+        for that rendering instead of drawing it again, so a crowd of
+        spectators woken by the same move costs a single render.
+        """
+        while True:
+            with self._lock:
+                value = self._entries.get(key)
+                if value is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                done = self._rendering.get(key)
+                if done is None:
+                    self.misses += 1
+                    done = self._rendering[key] = threading.Event()
+                    break
+            done.wait()  # then read the entry; render it ourselves if that render failed
+
+        # Render outside the lock so other sessions are not blocked
+        try:
+            value = render(key)
+            with self._lock:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        finally:
+            with self._lock:
+                del self._rendering[key]
+            done.set()
+        return value
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+BOARD_COLOR = "#8B4513"
+ULO_COLOR = "#00008B"
+HOUSE_COLOR = "#87CEEB"
+PEBBLE_COLOR = "black"
+
+# Define house and ulo indexes for easier handling
+P1_HOUSES = [5, 4, 3, 2, 1]  # Player 1 Houses (Top row, left to right)
+P2_HOUSES = [7, 8, 9, 10, 11]  # Player 2 Houses (Bottom row, left to right)
+P1_ULO = 6  # Player 1's ulo (left head)
+P2_ULO = 12  # Player 2's ulo (right head)
+POSITIONS = [-4, -2, 0, 2, 4]  # x of the houses in each row
+
+# Where each house's pebbles are centred, in slot order for pebble_offsets()
+PEBBLE_SLOTS = P1_HOUSES + P2_HOUSES
+PEBBLE_CENTERS = np.array([(x, 1) for x in POSITIONS] + [(x, -1) for x in POSITIONS], dtype=float)
+
+
+def pebble_offsets(houses):
+    """(n, 2) array with the centre of every pebble on the board."""
+    counts = np.array([houses[i] for i in PEBBLE_SLOTS])
+    j = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    offsets = np.repeat(PEBBLE_CENTERS, counts, axis=0)
+    offsets[:, 0] += (j % 3 - 1) * 0.25
+    offsets[:, 1] += (j // 3 - 0.5) * 0.25
+    return offsets
+
+
+class BoardRenderer:
+    """A board figure that is built once and updated in place.
+
+    The static board, houses and ulos are drawn when the renderer is created;
+    a new board only changes the count labels and the offsets of one
+    EllipseCollection holding every pebble.  Keep one renderer per session.
+    """
+
+    def __init__(self):
+        # Figure rather than pyplot: no global figure registry shared between session threads
+        self.fig = Figure(figsize=(10, 5))
+        FigureCanvasAgg(self.fig)
+        ax = self.fig.subplots()
+        label_box = dict(facecolor='red', edgecolor='black', boxstyle='round,pad=0.3')
+
+        ax.add_patch(patches.FancyBboxPatch((-6.5, -2), 13, 4, boxstyle="round,pad=0.2", color=BOARD_COLOR, ec="black", lw=2))
+
+        # Ulos (Player 1 on the left, Player 2 on the right)
+        self.labels = {}
+        for slot, x in ((P1_ULO, -5.5), (P2_ULO, 5.5)):
+            ax.add_patch(patches.Ellipse((x, 0), 1.5, 2.5, color=ULO_COLOR, ec="black", lw=2, zorder=1))
+            self.labels[slot] = ax.text(x, 0, "0", fontsize=14, ha='center', va='center',
+                                        color='white', bbox=label_box)
+
+        # Player 1 Houses (Top Row) and Player 2 Houses (Bottom Row)
+        for slots, y, label_y in ((P1_HOUSES, 1, 2.2), (P2_HOUSES, -1, -2.2)):
+            for i, x in zip(slots, POSITIONS):
+                ax.add_patch(patches.Circle((x, y), 0.8, color=HOUSE_COLOR, ec="black", lw=2, zorder=2))
+                self.labels[i] = ax.text(x, label_y, "0", fontsize=12, ha='center', va='center',
+                                         color='white', bbox=label_box)
+
+        # All pebbles in one collection
+        self.pebbles = EllipseCollection(0.15, 0.2, 0, units='xy', offsets=np.zeros((0, 2)),
+                                         offset_transform=ax.transData, facecolors=PEBBLE_COLOR, zorder=3)
+        ax.add_collection(self.pebbles)
+
+        ax.set_xlim(-8, 8)
+        ax.set_ylim(-5, 5)
+        ax.set_xticks([])
+        ax.set_yticks([])
+        ax.set_frame_on(False)
+        # The board never leaves the axes, so the tight crop is computed once
+        self.bbox = self.fig.get_tightbbox(self.fig.canvas.get_renderer()).padded(0.1)
+
+    def update(self, houses):
+        for slot, label in self.labels.items():
+            label.set_text(str(houses[slot]))
+        self.pebbles.set_offsets(pebble_offsets(houses))
+
+    def render_png(self, houses):
+        self.update(houses)
+        buf = io.BytesIO()
+        self.fig.savefig(buf, format="png", bbox_inches=self.bbox)
+        return buf.getvalue()
+
+
+# Function to draw the Sungka board for a 13-slot houses sequence
+def draw_sungka_board(houses):
+    renderer = BoardRenderer()
+    renderer.update(houses)
+    return renderer.fig
+
+
+def render_board_png(houses):
+    """PNG bytes of the board for a 13-slot houses sequence."""
+    return BoardRenderer().render_png(houses)
@@ -0,0 +1,85 @@
+"""SVG board renderer: the same layout as sungka_render, as a few KB of markup.
+
+The browser draws the SVG, so the server does no rasterization and this
+module does not import matplotlib.  Coordinates follow the matplotlib board
+(x from -8 to 8, y up), flipped into SVG's y-down space.
+"""
+
+BOARD_COLOR = "#8B4513"
+ULO_COLOR = "#00008B"
+HOUSE_COLOR = "#87CEEB"
+PEBBLE_COLOR = "black"
+LABEL_COLOR = "red"
+
+P1_HOUSES = [5, 4, 3, 2, 1]  # Player 1 Houses (Top row, left to right)
+P2_HOUSES = [7, 8, 9, 10, 11]  # Player 2 Houses (Bottom row, left to right)
+P1_ULO = 6  # Player 1's ulo (left head)
+P2_ULO = 12  # Player 2's ulo (right head)
+POSITIONS = [-4, -2, 0, 2, 4]  # x of the houses in each row
+
+VIEW_BOX = "-7 -2.8 14 5.6"
+
+
+def _label(x, y, value, size):
+    # Count in a red rounded box, like the matplotlib text bbox
+    text = str(value)
+    width = size * (0.6 * max(len(text), 2) + 0.6)  # fixed width so redrawn labels cover old ones
+    height = size * 1.4
+    return (f'<rect x="{x - width / 2:.2f}" y="{y - height / 2:.2f}" width="{width:.2f}" '
+            f'height="{height:.2f}" rx="0.08" fill="{LABEL_COLOR}" stroke="black" stroke-width="0.03"/>'
+            f'<text x="{x}" y="{y}" font-size="{size}" fill="white" text-anchor="middle" '
+            f'dominant-baseline="central" font-family="sans-serif">{text}</text>')
+
+
+def _pebbles(x, y, count):
+    return "".join(
+        f'<ellipse cx="{x + (j % 3 - 1) * 0.25:.2f}" cy="{y - (j // 3 - 0.5) * 0.25:.2f}" '
+        f'rx="0.075" ry="0.1" fill="{PEBBLE_COLOR}"/>'
+        for j in range(count))
+
+
+def _slot(slot, count):
+    # A ulo or house with its pebbles and count, drawn over whatever was there
+    if slot in (P1_ULO, P2_ULO):
+        x = -5.5 if slot == P1_ULO else 5.5
+        return (f'<ellipse cx="{x}" cy="0" rx="0.75" ry="1.25" fill="{ULO_COLOR}" '
+                f'stroke="black" stroke-width="0.05"/>' + _label(x, 0, count, 0.4))
+    if slot in P1_HOUSES:
+        x, y, label_y = POSITIONS[P1_HOUSES.index(slot)], -1, -2.2
+    else:
+        x, y, label_y = POSITIONS[P2_HOUSES.index(slot)], 1, 2.2
+    return (f'<circle cx="{x}" cy="{y}" r="0.8" fill="{HOUSE_COLOR}" stroke="black" stroke-width="0.05"/>'
+            + _pebbles(x, y, count) + _label(x, label_y, count, 0.34))
+
+
+DRAWN_SLOTS = [P1_ULO, P2_ULO] + P1_HOUSES + P2_HOUSES
+
+HEADER = (f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="{VIEW_BOX}" width="100%">'
+          f'<rect x="-6.7" y="-2.2" width="13.4" height="4.4" rx="0.2" fill="{BOARD_COLOR}" '
+          f'stroke="black" stroke-width="0.05"/>')
+
+
+def render_board_svg(houses):
+    """SVG markup of the board for a 13-slot houses sequence."""
+    return HEADER + "".join(_slot(slot, houses[slot]) for slot in DRAWN_SLOTS) + '</svg>'
+
+
+def render_sowing_svg(frames, frame_seconds=0.3):
+    """Animated SVG replaying a sequence of boards in the browser.
+
+    The first board is drawn as usual; every later board only redraws the
+    slots that changed, in a group made visible after a CSS animation delay.
+    Playback runs entirely on the client and stops on the last board.
+    """
+    parts = [HEADER,
+             '<style>@keyframes sungka-show { to { opacity: 1; } }</style>']
+    parts.extend(_slot(slot, frames[0][slot]) for slot in DRAWN_SLOTS)
+    previous = frames[0]
+    for k, frame in enumerate(frames[1:], 1):
+        changed = [slot for slot in DRAWN_SLOTS if frame[slot] != previous[slot]]
+        previous = frame
+        if changed:
+            parts.append(f'<g style="opacity:0;animation:sungka-show 0s {k * frame_seconds:.2f}s forwards">'
+                         + "".join(_slot(slot, frame[slot]) for slot in changed) + '</g>')
+    parts.append('</svg>')
+    return "".join(parts)
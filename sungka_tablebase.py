@@ -0,0 +1,209 @@
+"""Endgame tablebase: exact values for every position with few stones in the houses.
+
+Stones never leave a ulo, so the outcome from any position is the current
+ulo difference plus what each side still banks.  The tablebase stores that
+future margin, ``V(houses, player)``, for the player to move under perfect
+play (the game ends when the player to move has no stones in their houses).
+
+Positions are solved by retrograde analysis.  A move either banks a stone
+(the house total drops) or only shifts stones towards the mover's ulo, so
+ordering positions by house total and then by the stones' total distance
+to their ulo puts every successor before its predecessors.  Each position
+is then solved once from already-known successor values.
+
+Build it offline:
+
+    python sungka_tablebase.py --stones 10 --out endgame.bin
+
+File layout: a 16-byte header (magic b"SKTB", version, max stones, entry
+count) followed by one int8 per (distribution, player).  Distributions of
+n stones over the 10 houses are ranked with the combinatorial number
+system, after all distributions with fewer stones.
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import time
+from array import array
+from math import comb
+
+import sungka_engine as engine
+
+MAGIC = b"SKTB"
+VERSION = 1
+HEADER = struct.Struct("<4sBBxxI4x")
+
+DEFAULT_TABLEBASE_PATH = "endgame.bin"
+
+HOUSE_SLOTS = engine.P1_HOUSES + engine.P2_HOUSES
+NUM_HOUSES = len(HOUSE_SLOTS)
+
+
+class Ranking:
+    """Maps stone distributions over the houses to dense indexes."""
+
+    def __init__(self, max_stones):
+        self.max_stones = max_stones
+        k = NUM_HOUSES
+        # offset[n]: distributions with fewer than n stones
+        self.offset = [comb(n - 1 + k, k) for n in range(max_stones + 2)]
+        # skip[m][r][c]: distributions of r stones over m + 1 houses whose
+        # first house holds fewer than c stones
+        self.skip = [[[sum(comb(r - v + m - 1, m - 1) if m else int(v == r) for v in range(c))
+                       for c in range(r + 1)]
+                      for r in range(max_stones + 1)]
+                     for m in range(k)]
+
+    def size(self):
+        return self.offset[self.max_stones + 1]
+
+    def rank(self, counts):
+        """Index of a distribution given as the 10 house counts (sowing order)."""
+        rest = sum(counts)
+        index = self.offset[rest]
+        skip = self.skip
+        m = NUM_HOUSES - 1
+        for count in counts[:-1]:
+            index += skip[m][rest][count]
+            rest -= count
+            m -= 1
+        return index
+
+
+def distributions(n, k=NUM_HOUSES):
+    """All distributions of ``n`` stones over ``k`` houses, in rank order."""
+    if k == 1:
+        yield (n,)
+        return
+    for first in range(n + 1):
+        for rest in distributions(n - first, k - 1):
+            yield (first,) + rest
+
+
+def _potential(counts):
+    # Total distance of every stone to its owner's ulo
+    dist1, dist2 = engine.ULO_DISTANCE[1], engine.ULO_DISTANCE[2]
+    total = 0
+    for slot, count in zip(HOUSE_SLOTS, counts):
+        total += count * (dist1[slot] if engine.OWNER[slot] == 1 else dist2[slot])
+    return total
+
+
+def _house_counts(houses):
+    return [houses[slot] for slot in HOUSE_SLOTS]
+
+
+def build_tablebase(path, max_stones):
+    ranking = Ranking(max_stones)
+    values = array('b', bytes(2 * ranking.size()))
+    houses = [0] * engine.NUM_SLOTS
+
+    for n in range(max_stones + 1):
+        for counts in sorted(distributions(n), key=_potential):
+            for slot, count in zip(HOUSE_SLOTS, counts):
+                houses[slot] = count
+            index = ranking.rank(counts)
+            for player in (1, 2):
+                state = engine.State(houses, player)
+                best = 0  # no stones to move: the game is over
+                moves = engine.legal_moves(state)
+                if moves:
+                    best = -128
+                ulo = engine.ULO[player]
+                for pit in moves:
+                    undo = engine.make_move(state, pit)
+                    child = 2 * ranking.rank(_house_counts(state.houses)) + state.player - 1
+                    gain = state.houses[ulo]
+                    if state.player == player:
+                        value = gain + values[child]
+                    else:
+                        value = gain - values[child]
+                    engine.unmake_move(state, undo)
+                    if value > best:
+                        best = value
+                values[2 * index + player - 1] = best
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, max_stones, len(values)))
+        values.tofile(f)
+    os.replace(tmp_path, path)
+    return len(values)
+
+
+class Tablebase:
+    """Read-only, memory-mapped endgame tablebase."""
+
+    def __init__(self, path=DEFAULT_TABLEBASE_PATH):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, max_stones, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a Sungka tablebase")
+        self.max_stones = max_stones
+        self.ranking = Ranking(max_stones)
+        self.values = memoryview(self._mmap)[HEADER.size:HEADER.size + count].cast('b')
+
+    def close(self):
+        self.values.release()
+        self._mmap.close()
+
+    def covers(self, state):
+        if state.variant is not engine.STANDARD:
+            return False  # built for the standard board only
+        return state.stones[1] + state.stones[2] <= self.max_stones
+
+    def value(self, state):
+        """Future ulo margin for the player to move under perfect play."""
+        index = self.ranking.rank(_house_counts(state.houses))
+        return self.values[2 * index + state.player - 1]
+
+    def final_margin(self, state):
+        """Final ulo difference for the player to move under perfect play."""
+        p1, p2 = engine.scores(state)
+        margin = p1 - p2 if state.player == 1 else p2 - p1
+        return margin + self.value(state)
+
+    def best_move(self, state):
+        """Move that achieves the tablebase value (None when the game is over)."""
+        player = state.player
+        ulo = engine.ULO[player]
+        state = state.copy()
+        best_move, best = None, None
+        for pit in engine.legal_moves(state):
+            before = state.houses[ulo]
+            undo = engine.make_move(state, pit)
+            gain = state.houses[ulo] - before
+            if state.player == player:
+                value = gain + self.value(state)
+            else:
+                value = gain - self.value(state)
+            engine.unmake_move(state, undo)
+            if best is None or value > best:
+                best_move, best = pit, value
+        return best_move
+
+
+def load_tablebase(path=DEFAULT_TABLEBASE_PATH):
+    """Tablebase for ``path``, or None if none has been built."""
+    if not os.path.exists(path):
+        return None
+    return Tablebase(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the Sungka endgame tablebase.")
+    parser.add_argument("--stones", type=int, default=10, help="maximum stones left in the houses")
+    parser.add_argument("--out", default=DEFAULT_TABLEBASE_PATH)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    count = build_tablebase(args.out, args.stones)
+    print(f"Wrote {count} entries to {args.out} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""Round-robin self-play tournaments between bot configurations.
+
+    python sungka_tournament.py random alphabeta:0.01:2 alphabeta:0.05:6 mcts:0.05 \\
+        --games 1000 --out results.jsonl
+
+Every pair of bots plays ``--games`` games, swapping seats every game, in a
+process pool.  Results are appended to ``--out`` (JSON lines, or CSV when
+the name ends in .csv) as batches finish, and only a bitmap of finished
+games and the per-pair totals are kept in memory.  Running the same command
+again resumes: games already in the file are skipped.  Every row records
+the rules it was played under (board, starting stones, skip rule and round
+limit), and a file holding other bots or other rules is refused rather than
+mixed into one table.  The run ends with a win/draw/loss table and Elo
+ratings fitted to all results in the file.
+
+Bot specs:
+
+    random                    uniformly random move, like the original bot_move
+    alphabeta:SECONDS[:DEPTH] AlphaBetaBot with that budget per move
+    mcts:SECONDS              MCTSBot searching inside the worker process
+    easy, medium, hard        the app's difficulty presets (alpha-beta)
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import combinations
+
+import sungka_engine as engine
+from sungka_bot import DIFFICULTY_BUDGETS, AlphaBetaBot, RandomBot
+
+RULE_FIELDS = ["pits", "stones", "skipped_ulo", "max_rounds"]
+FIELDS = ["game", "player1", "player2", "winner", "score1", "score2", "moves"] + RULE_FIELDS
+
+
+def make_bot(spec, max_rounds=None, seed=None):
+    """Bot for a spec string (see the module docstring); raises ValueError for bad specs."""
+    kind, _, params = spec.lower().partition(":")
+    values = [float(value) for value in params.split(":")] if params else []
+    if kind == "random" and not values:
+        return RandomBot(seed)
+    if kind == "alphabeta" and 1 <= len(values) <= 2:
+        max_depth = int(values[1]) if len(values) == 2 else 64
+        return AlphaBetaBot(values[0], max_depth, max_rounds)
+    if kind == "mcts" and len(values) == 1:
+        from sungka_mcts import MCTSBot
+        return MCTSBot(values[0], max_rounds=max_rounds, inline=True)
+    if kind.capitalize() in DIFFICULTY_BUDGETS and not values:
+        time_budget, max_depth = DIFFICULTY_BUDGETS[kind.capitalize()]
+        return AlphaBetaBot(time_budget, max_depth, max_rounds)
+    raise ValueError(f"Unknown bot spec {spec!r}")
+
+
+def seating(num_bots, game_id):
+    """(bot index for Player 1, bot index for Player 2) of a game.
+
+    Game ids run round by round over all pairs, so they keep their meaning
+    when a tournament is resumed with more games per pair.
+    """
+    pairs = list(combinations(range(num_bots), 2))
+    k, p = divmod(game_id, len(pairs))
+    a, b = pairs[p]
+    return (a, b) if k % 2 == 0 else (b, a)
+
+
+def schedule(num_bots, games):
+    """Yield (game id, bot index for Player 1, bot index for Player 2) in id order."""
+    pairs = list(combinations(range(num_bots), 2))
+    for k in range(games):
+        for p, (a, b) in enumerate(pairs):
+            game_id = k * len(pairs) + p
+            yield (game_id, a, b) if k % 2 == 0 else (game_id, b, a)
+
+
+def rules_of(variant, max_rounds):
+    """The rule columns written with every result row."""
+    return {"pits": variant.pits, "stones": variant.stones, "skipped_ulo": variant.skipped_ulo,
+            "max_rounds": max_rounds}
+
+
+def row_rules(row):
+    """The rule columns of a row read back from JSONL or CSV (None if it has none)."""
+    if any(row.get(field) is None for field in ("pits", "stones", "skipped_ulo")):
+        return None
+    max_rounds = row.get("max_rounds")
+    return {"pits": int(row["pits"]), "stones": int(row["stones"]), "skipped_ulo": row["skipped_ulo"],
+            "max_rounds": int(max_rounds) if max_rounds not in (None, "") else None}
+
+
+def play_game(bot1, bot2, variant=engine.STANDARD, max_rounds=None):
+    """Play one game with Player 1 moving first; return (final state, moves played)."""
+    state = engine.new_game(1, variant)
+    bots = {1: bot1, 2: bot2}
+    moves = 0
+    while not engine.is_terminal(state, max_rounds):
+        engine.make_move(state, bots[state.player].choose_move(state))
+        moves += 1
+    return state, moves
+
+
+def _play_batch(args):
+    specs, variant, max_rounds, games = args
+    rules = rules_of(variant, max_rounds)
+    rows = []
+    for game_id, a, b in games:
+        bot1 = make_bot(specs[a], max_rounds, seed=2 * game_id)
+        bot2 = make_bot(specs[b], max_rounds, seed=2 * game_id + 1)
+        state, moves = play_game(bot1, bot2, variant, max_rounds)
+        score1, score2 = engine.scores(state)
+        rows.append({"game": game_id, "player1": specs[a], "player2": specs[b],
+                     "winner": engine.winner(state), "score1": score1, "score2": score2,
+                     "moves": moves, **rules})
+    return rows
+
+
+class Standings:
+    """Win/draw/loss totals per ordered pair of bots, from the first bot's side."""
+
+    def __init__(self, names):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        n = len(self.names)
+        self.wins = [[0] * n for _ in range(n)]
+        self.draws = [[0] * n for _ in range(n)]
+
+    def add(self, row):
+        a, b = self.index[row["player1"]], self.index[row["player2"]]
+        winner = int(row["winner"])
+        if winner == 1:
+            self.wins[a][b] += 1
+        elif winner == 2:
+            self.wins[b][a] += 1
+        else:
+            self.draws[a][b] += 1
+            self.draws[b][a] += 1
+
+    def record(self, i):
+        wins = sum(self.wins[i])
+        draws = sum(self.draws[i])
+        losses = sum(self.wins[j][i] for j in range(len(self.names)))
+        return wins, draws, losses
+
+    def elo(self, iterations=500):
+        """Elo ratings (mean 0) fitted to every result by Bradley-Terry, a draw counting half."""
+        n = len(self.names)
+        games = [[self.wins[i][j] + self.wins[j][i] + self.draws[i][j] for j in range(n)] for i in range(n)]
+        score = [sum(self.wins[i]) + 0.5 * sum(self.draws[i]) for i in range(n)]
+        # Half a draw against a virtual equal opponent keeps all-win/all-loss bots finite
+        strength = [1.0] * n
+        for _ in range(iterations):
+            for i in range(n):
+                denominator = sum(games[i][j] / (strength[i] + strength[j]) for j in range(n) if j != i)
+                denominator += 1.0 / (strength[i] + 1.0)
+                strength[i] = (score[i] + 0.5) / denominator
+        ratings = [400 * math.log10(s) for s in strength]
+        mean = sum(ratings) / n
+        return [r - mean for r in ratings]
+
+    def summary(self):
+        width = max(len(name) for name in self.names)
+        lines = [f"{'bot':<{width}}  {'games':>7} {'wins':>7} {'draws':>7} {'losses':>7} {'score':>6} {'elo':>6}"]
+        ratings = self.elo()
+        for i in sorted(range(len(self.names)), key=lambda i: -ratings[i]):
+            wins, draws, losses = self.record(i)
+            games = wins + draws + losses
+            score = (wins + 0.5 * draws) / games if games else 0.0
+            lines.append(f"{self.names[i]:<{width}}  {games:>7} {wins:>7} {draws:>7} {losses:>7} "
+                         f"{score:>6.1%} {ratings[i]:>+6.0f}")
+        return "\n".join(lines)
+
+
+class ResultFile:
+    """Append-only JSONL or CSV result file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.csv = path.endswith(".csv")
+
+    def rows(self):
+        """Stream the rows already in the file (nothing if it does not exist)."""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, newline="") as f:
+            lines = (line for line in f if line.endswith("\n"))  # open() drops a partial last line
+            if self.csv:
+                yield from csv.DictReader(lines)
+            else:
+                for line in lines:
+                    yield json.loads(line)
+
+    def _drop_partial_line(self):
+        # A run killed mid-write can leave half a row; cut it so appends start on a new line
+        with open(self.path, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            position = size
+            while position > 0:
+                step = min(4096, position)
+                f.seek(position - step)
+                newline = f.read(step).rfind(b"\n")
+                if newline >= 0:
+                    position = position - step + newline + 1
+                    break
+                position -= step
+            if position != size:
+                f.truncate(position)
+
+    def open(self):
+        if os.path.exists(self.path):
+            self._drop_partial_line()
+        new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        self._file = open(self.path, "a", newline="")
+        if self.csv:
+            self._writer = csv.DictWriter(self._file, FIELDS)
+            if new:
+                self._writer.writeheader()
+        return self
+
+    def write(self, rows):
+        if self.csv:
+            self._writer.writerows(rows)
+        else:
+            self._file.writelines(json.dumps(row) + "\n" for row in rows)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def run_tournament(specs, games, out, workers=None, batch=16, variant=engine.STANDARD,
+                   max_rounds=None, progress=None):
+    """Play the round robin into ``out`` (resuming from its rows) and return the Standings."""
+    total = len(specs) * (len(specs) - 1) // 2 * games
+    standings = Standings(specs)
+    finished = bytearray((total + 7) // 8)
+    rules = rules_of(variant, max_rounds)
+    results = ResultFile(out)
+    for row in results.rows():
+        game_id = int(row["game"])
+        if row_rules(row) != rules:
+            raise ValueError(f"{out} holds games played under other rules "
+                             f"(game {game_id}: {row_rules(row) or 'rules not recorded'})")
+        a, b = seating(len(specs), game_id)
+        if (row["player1"], row["player2"]) != (specs[a], specs[b]):
+            raise ValueError(f"{out} holds games of another tournament "
+                             f"(game {game_id}: {row['player1']} v {row['player2']})")
+        if game_id >= total:
+            standings.add(row)  # from an earlier run with more games per pair
+        elif not finished[game_id >> 3] >> (game_id & 7) & 1:
+            finished[game_id >> 3] |= 1 << (game_id & 7)
+            standings.add(row)
+
+    pending = (game for game in schedule(len(specs), games)
+               if not finished[game[0] >> 3] >> (game[0] & 7) & 1)
+    workers = workers or os.cpu_count() or 1
+    done_count = sum(bin(byte).count("1") for byte in finished)
+    results.open()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            in_flight = set()
+            while True:
+                # Keep a bounded number of batches queued so the schedule is never materialized
+                while len(in_flight) < 2 * workers:
+                    chunk = [game for _, game in zip(range(batch), pending)]
+                    if not chunk:
+                        break
+                    in_flight.add(executor.submit(_play_batch, (specs, variant, max_rounds, chunk)))
+                if not in_flight:
+                    break
+                completed, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    rows = future.result()
+                    results.write(rows)
+                    for row in rows:
+                        standings.add(row)
+                    done_count += len(rows)
+                if progress is not None:
+                    progress(done_count, total)
+    finally:
+        results.close()
+    return standings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play a round-robin tournament between Sungka bots.")
+    parser.add_argument("bots", nargs="+", help="bot specs, e.g. random alphabeta:0.05:6 mcts:0.1 hard")
+    parser.add_argument("--games", type=int, default=100, help="games per pair of bots")
+    parser.add_argument("--out", default="tournament.jsonl", help="result file (.jsonl or .csv)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--batch", type=int, default=16, help="games per task sent to a worker")
+    parser.add_argument("--max-rounds", type=int, default=None, help="round limit of the rules (app: 5)")
+    parser.add_argument("--pits", type=int, default=5, help="houses per side")
+    parser.add_argument("--stones", type=int, default=7, help="starting stones per house")
+    parser.add_argument("--skipped-ulo", choices=engine.SKIPPED_ULO_RULES, default="opponent")
+    args = parser.parse_args(argv)
+
+    if len(set(args.bots)) != len(args.bots) or len(args.bots) < 2:
+        parser.error("give at least two different bot specs")
+    for spec in args.bots:
+        try:
+            make_bot(spec)
+        except ValueError as e:
+            parser.error(str(e))
+    variant = engine.get_variant(args.pits, args.stones, args.skipped_ulo)
+
+    start = time.perf_counter()
+    last_report = [start]
+
+    def progress(done, total):
+        now = time.perf_counter()
+        if now - last_report[0] >= 5 or done == total:
+            last_report[0] = now
+            print(f"{done}/{total} games ({done / total:.0%}) after {now - start:.0f}s", flush=True)
+
+    try:
+        standings = run_tournament(args.bots, args.games, args.out, args.workers, args.batch, variant,
+                                   args.max_rounds, progress)
+    except ValueError as e:
+        parser.error(str(e))
+    print(standings.summary())
+
+
+if __name__ == "__main__":
+    main()
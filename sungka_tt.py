@@ -0,0 +1,86 @@
+"""Bounded, thread-safe transposition table shared by every search in a process.
+
+Entries live in preallocated parallel arrays, so memory is fixed when the
+table is created.  A key maps to one slot (``key & (size - 1)``); a new
+result replaces the slot only if it comes from an equal or deeper search
+(or the slot already holds the same position).  Slots are guarded by a
+fixed number of striped locks, so concurrent Streamlit sessions only
+contend when they touch the same stripe.
+"""
+
+import threading
+from array import array
+
+# Bound flags
+EXACT = 0
+LOWER = 1  # score is a lower bound (the search failed high)
+UPPER = 2  # score is an upper bound (the search failed low)
+
+# keys (8) + score (4) + depth, flag, move (1 each)
+ENTRY_BYTES = 15
+
+
+class TranspositionTable:
+    def __init__(self, size_mb=16, stripes=64):
+        entries = max(1, (size_mb << 20) // ENTRY_BYTES)
+        self.size = 1 << (entries.bit_length() - 1)  # round down to a power of two
+        self.mask = self.size - 1
+        self.keys = array('Q', bytes(8 * self.size))
+        self.scores = array('i', bytes(4 * self.size))
+        self.depths = array('b', [-1]) * self.size
+        self.flags = array('b', bytes(self.size))
+        self.moves = array('b', bytes(self.size))
+        self.stripes = stripes
+        self.locks = [threading.Lock() for _ in range(stripes)]
+        # Per-stripe counters, updated under the stripe lock
+        self.probes = [0] * stripes
+        self.hits = [0] * stripes
+        self.stores = [0] * stripes
+
+    def probe(self, key):
+        """Return (depth, score, flag, move) stored for ``key``, or None."""
+        i = key & self.mask
+        stripe = i % self.stripes
+        with self.locks[stripe]:
+            self.probes[stripe] += 1
+            if self.depths[i] < 0 or self.keys[i] != key:
+                return None
+            self.hits[stripe] += 1
+            return self.depths[i], self.scores[i], self.flags[i], self.moves[i]
+
+    def store(self, key, depth, score, flag, move):
+        i = key & self.mask
+        stripe = i % self.stripes
+        with self.locks[stripe]:
+            # Depth-preferred replacement
+            if self.keys[i] != key and depth < self.depths[i]:
+                return
+            self.keys[i] = key
+            self.depths[i] = min(depth, 127)
+            self.scores[i] = score
+            self.flags[i] = flag
+            self.moves[i] = move
+            self.stores[stripe] += 1
+
+    def clear(self):
+        for lock in self.locks:
+            lock.acquire()
+        try:
+            self.depths[:] = array('b', [-1]) * self.size
+            self.probes = [0] * self.stripes
+            self.hits = [0] * self.stripes
+            self.stores = [0] * self.stripes
+        finally:
+            for lock in self.locks:
+                lock.release()
+
+    def stats(self):
+        probes = sum(self.probes)
+        hits = sum(self.hits)
+        return {
+            "size": self.size,
+            "probes": probes,
+            "hits": hits,
+            "stores": sum(self.stores),
+            "hit_rate": hits / probes if probes else 0.0,
+        }
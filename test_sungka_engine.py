@@ -0,0 +1,82 @@
+"""Rules regression tests for sungka_engine: perft counts and make/unmake.
+
+    python -m pytest -q
+"""
+
+import random
+
+import pytest
+
+import sungka_engine as engine
+from sungka_perft import REFERENCE_COUNTS, perft
+
+# The last one starts with 40 stones per house, so piles outgrow the first Zobrist tables
+VARIANTS = [engine.STANDARD, engine.TRADITIONAL, engine.get_variant(5, 7, "none"), engine.get_variant(2, 40)]
+
+
+def naive_move(houses, player, round, pit, variant):
+    # Sow one stone at a time around the board, straight from the rules
+    houses = list(houses)
+    opponent_ulo = variant.ulo[3 - player] if variant.skipped_ulo == "opponent" else None
+    count, houses[pit] = houses[pit], 0
+    pos = pit
+    while count:
+        pos = (pos + 1) % variant.num_slots
+        if pos == engine.UNUSED_SLOT or pos == opponent_ulo:
+            continue
+        houses[pos] += 1
+        count -= 1
+    if pos == variant.ulo[player]:
+        return houses, player, round
+    return houses, 3 - player, round + 1
+
+
+def assert_consistent(state):
+    variant = state.variant
+    houses = state.houses
+    stones = [0, 0, 0]
+    for i, count in enumerate(houses):
+        stones[variant.owner[i]] += count
+    assert state.stones == stones
+    assert state.mask == sum(1 << i for i, count in enumerate(houses) if count)
+    assert state.key == engine.zobrist(houses, state.player, variant)
+
+
+@pytest.mark.parametrize("depth", range(1, 7))
+def test_perft_reference_counts(depth):
+    assert perft(engine.new_game(1), depth) == REFERENCE_COUNTS[depth]
+
+
+@pytest.mark.parametrize("variant", VARIANTS, ids=str)
+def test_make_unmake_round_trip(variant):
+    rng = random.Random(20240518)
+    for _ in range(40):
+        state = engine.new_game(rng.choice((1, 2)), variant)
+        while not engine.is_terminal(state):
+            before = state.copy()
+            for pit in engine.legal_moves(state):
+                expected = naive_move(before.houses, before.player, before.round, pit, variant)
+                undo = engine.make_move(state, pit)
+                assert (state.to_list(), state.player, state.round) == expected
+                assert_consistent(state)
+                engine.unmake_move(state, undo)
+                assert state == before
+                assert (state.key, state.mask, state.stones) == (before.key, before.mask, before.stones)
+            engine.make_move(state, rng.choice(engine.legal_moves(state)))
+
+
+def test_big_piles_match_single_stone_sowing():
+    # More stones than a lap exercises the arithmetic path of make_move
+    rng = random.Random(7)
+    variant = engine.STANDARD
+    for _ in range(500):
+        houses = [0] * variant.num_slots
+        for pit in variant.houses[1] + variant.houses[2]:
+            houses[pit] = rng.randrange(0, 40)
+        player = rng.choice((1, 2))
+        pit = rng.choice(variant.houses[player])
+        houses[pit] += 1
+        state = engine.State(houses, player)
+        engine.make_move(state, pit)
+        assert (state.to_list(), state.player, state.round) == naive_move(houses, player, 1, pit, variant)
+        assert_consistent(state)